@@ -1,8 +1,9 @@
 # This was written with the help of Claude AI, but substantial written text is mine.
 
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
+
+from utils.page_export import page_content
+from utils.profiling import end_run, stage, start_run
 
 # Page configuration
 st.set_page_config(
@@ -11,39 +12,18 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Load data once and cache
-@st.cache_data
-def load_data():
-    """
-    Loads and preprocesses the novel dataset.
-    This function ensures data is loaded only once and shared across all pages.
-    """
-    df = pd.read_csv('data/final_dataset.csv')
-    df['decade'] = (df['publication_year'] // 10) * 10
-    
-    # Consolidate country names
-    uk_variants = ['United Kingdom', 'England', 'United Kingdom of Great Britain and Ireland',
-                   'Kingdom of Great Britain', 'Great Britain']
-    df['country_consolidated'] = df['country_grouped'].replace(uk_variants, 'United Kingdom')
-    
-    us_variants = ['United States', 'United States of America']
-    df['country_consolidated'] = df['country_consolidated'].replace(us_variants, 'United States')
-    
-    # Set chronological ordering for literary periods
-    period_order = ['classical', 'romantic', 'victorian', 'modernist', 'postwar', 'contemporary', 'modern', 'unknown']
-    df['literary_period'] = pd.Categorical(df['literary_period'], categories=period_order, ordered=True)
-    
-    return df
-
-# Initialize Session State for Data (available to all pages)
-if 'data' not in st.session_state:
-    st.session_state['data'] = load_data()
-
-df = st.session_state['data']
-df_classified = df[df['fiction_type'].notna()].copy()
-
-# Color scheme
-colors = {'speculative': '#e74c3c', 'realistic': '#3498db', 'other': '#95a5a6'}
+# Per-rerun timings, shown in the sidebar when NOVELS_PROFILE is set
+start_run('Home')
+stage('load')
+
+# Counts, model results and figures, computed from the shared dataset (with figures
+# cached across sessions), or read from the precomputed export in static mode
+content = page_content('home')
+counts = content['counts']
+results = content['results']
+# The baseline's wording, following the sign of the accuracy difference
+improved = results['diff'] > 0
+change = 'increase' if improved else 'decrease'
 
 # ============================================
 # HOME PAGE CONTENT
@@ -72,17 +52,19 @@ films, which gave me my 709 articles.
 ### Dataset Summary
 """)
 
+stage('render')
+
 col1, col2, col3, col4, col5 = st.columns(5)
 with col1:
-    st.metric("Total", len(df))
+    st.metric("Total", counts['total'])
 with col2:
-    st.metric("Speculative", len(df[df['fiction_type']=='speculative']))
+    st.metric("Speculative", counts['speculative'])
 with col3:
-    st.metric("Realistic", len(df[df['fiction_type']=='realistic']))
+    st.metric("Realistic", counts['realistic'])
 with col4:
-    st.metric("Other", len(df[df['fiction_type']=='other']))
+    st.metric("Other", counts['other'])
 with col5:
-    st.metric("Unclassified", len(df[df['fiction_type'].isna()]))
+    st.metric("Unclassified", counts['unclassified'])
 
 st.markdown("---")
 
@@ -120,42 +102,33 @@ st.markdown("""
 
 col1, col2, col3 = st.columns(3)
 with col1:
-    st.metric("Text-Only Model", "69.4%")
+    st.metric("Text-Only Model", f"{results['text_only']:.1f}%")
 with col2:
-    st.metric("Text + Period Model", "75.8%", delta="+6.4%")
+    st.metric("Text + Period Model", f"{results['text_period']:.1f}%", delta=f"{results['diff']:+.1f}%")
 with col3:
-    st.metric("Statistical Significance", "p = 0.50", delta="Not Significant", delta_color="inverse")
-
-st.markdown("""
-**Main Finding:** Although adding literary period did increase text classificatoin accuracy 
-by 6.4% points, conducting a hypothesis test showed that this was not statistically significant
-(p = 0.50). Therefore, the increase in accuracy may be due to chance.
+    if results['significant']:
+        st.metric("Statistical Significance", f"p = {results['p_value']:.2f}", delta="Significant")
+    else:
+        st.metric("Statistical Significance", f"p = {results['p_value']:.2f}", delta="Not Significant",
+                  delta_color="inverse")
+
+if results['significant']:
+    st.markdown(f"""
+**Main Finding:** Adding literary period {'improved' if improved else 'reduced'} text classification accuracy by {abs(results['diff']):.1f}% points,
+and conducting a hypothesis test showed that this was statistically significant (p = {results['p_value']:.2f}).
+""")
+else:
+    st.markdown(f"""
+**Main Finding:** Although adding literary period did {change} text classificatoin accuracy 
+by {abs(results['diff']):.1f}% points, conducting a hypothesis test showed that this was not statistically significant
+(p = {results['p_value']:.2f}). Therefore, the {change} in accuracy may be due to chance.
 """)
 
 st.markdown("---")
 
 st.markdown("### Change Over Time")
 
-decade_counts = pd.crosstab(df_classified['decade'], df_classified['fiction_type'])
-
-fig = go.Figure()
-for ftype in ['realistic', 'speculative', 'other']:
-    if ftype in decade_counts.columns:
-        fig.add_trace(go.Scatter(
-            x=decade_counts.index, y=decade_counts[ftype],
-            name=ftype.title(), mode='lines+markers',
-            fill='tonexty' if ftype != 'realistic' else 'tozeroy',
-            line=dict(color=colors[ftype], width=2), stackgroup='one'
-        ))
-
-fig.update_layout(
-    title='Novels Published by Decade',
-    xaxis_title='Decade',
-    yaxis_title='Number of Novels',
-    hovermode='x unified',
-    height=500
-)
-st.plotly_chart(fig, use_container_width=True, key="home_timeline")
+st.plotly_chart(content['figures']['home_timeline'], use_container_width=True, key="home_timeline")
 
 st.markdown("**Observation:** Speculative fiction seems to become more dominant from 1950.")
 
@@ -163,28 +136,7 @@ st.markdown("---")
 
 st.markdown("### Fiction Types by Literary Period")
 
-period_pct = pd.crosstab(df_classified['literary_period'], df_classified['fiction_type'], 
-                         normalize='index') * 100
-
-fig = go.Figure()
-for ftype in ['realistic', 'speculative', 'other']:
-    if ftype in period_pct.columns:
-        fig.add_trace(go.Bar(
-            name=ftype.title(), x=period_pct.index, y=period_pct[ftype],
-            marker_color=colors[ftype],
-            text=period_pct[ftype].round(1),
-            texttemplate='%{text}%',
-            textposition='inside'
-        ))
-
-fig.update_layout(
-    title='Fiction Type Distribution by Literary Period (%)',
-    xaxis_title='Literary Period',
-    yaxis_title='Percentage',
-    barmode='stack',
-    height=500
-)
-st.plotly_chart(fig, use_container_width=True, key="home_period")
+st.plotly_chart(content['figures']['home_period'], use_container_width=True, key="home_period")
 
 st.markdown("**Observation:** Genre distribution does seem (visually) to change across period.")
 
@@ -192,9 +144,19 @@ st.markdown("---")
 
 st.markdown("### Takeaways")
 
-st.markdown("""
-    - 6.4% accuracy increase observed but was not statistically significant
-    - 75.8% accuracy remains above a 50% baseline of random guessing
+if results['significant']:
+    st.markdown(f"""
+    - {abs(results['diff']):.1f}% accuracy {change} observed and was statistically significant
+    - {results['text_period']:.1f}% accuracy remains above a 50% baseline of random guessing
+    - Speculative fiction seems to have grown in 20th century
+    - Relationship exists visually, and period improves prediction
+    """)
+else:
+    st.markdown(f"""
+    - {abs(results['diff']):.1f}% accuracy {change} observed but was not statistically significant
+    - {results['text_period']:.1f}% accuracy remains above a 50% baseline of random guessing
     - Speculative fiction seems to have grown in 20th century
     - Relationship exists visually, but period doesn't improve prediction
-    """)
\ No newline at end of file
+    """)
+
+end_run()
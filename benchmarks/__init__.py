@@ -0,0 +1,6 @@
+# This was written with the help of Claude AI, but substantial written text is mine.
+
+"""
+Synthetic-scale benchmarks for the Streamlit pages.
+See benchmarks/run.py for how to generate data and run them.
+"""
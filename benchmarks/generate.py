@@ -0,0 +1,60 @@
+# This was written with the help of Claude AI, but substantial written text is mine.
+
+"""
+Synthetic datasets with the final_dataset.csv schema, for benchmarking.
+
+Rows are sampled (with replacement) from the real dataset, so every column
+keeps its real mix of values, missing entries and text lengths; only the
+qid is rewritten so each row is unique. The CSV is written in chunks, so
+even the 10M row dataset never has to fit in memory.
+
+Each dataset goes in its own working directory laid out like the repo
+(`<dir>/data/final_dataset.csv`), so the app can run against it unchanged:
+    python -m benchmarks.generate --sizes 10k 100k
+"""
+
+import os
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from utils.data import CSV_PATH
+
+SIZES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000, '10m': 10_000_000}
+WORK_DIR = 'benchmarks/work'
+
+# Synthetic qids start here, well above any real Wikidata id in the dataset
+QID_START = 900_000_000
+
+
+def work_dir(size, root=WORK_DIR):
+    return os.path.join(root, size)
+
+
+def generate(n_rows, out_path, source_path=CSV_PATH, seed=0, chunksize=100_000):
+    """
+    Writes `n_rows` synthetic rows to `out_path` and returns the path.
+    """
+    source = pd.read_csv(source_path)
+    rng = np.random.default_rng(seed)
+    os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+
+    for start in range(0, n_rows, chunksize):
+        stop = min(start + chunksize, n_rows)
+        chunk = source.iloc[rng.integers(0, len(source), stop - start)].copy()
+        chunk['qid'] = [f"Q{QID_START + i}" for i in range(start, stop)]
+        chunk.to_csv(out_path, mode='w' if start == 0 else 'a', header=(start == 0), index=False)
+    return out_path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate synthetic benchmark datasets.')
+    parser.add_argument('--sizes', nargs='+', default=['10k'], choices=list(SIZES))
+    parser.add_argument('--root', default=WORK_DIR)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        path = generate(SIZES[size], os.path.join(work_dir(size, args.root), CSV_PATH), seed=args.seed)
+        print(f"{size}: wrote {SIZES[size]:,} rows to {path}")
@@ -0,0 +1,199 @@
+# This was written with the help of Claude AI, but substantial written text is mine.
+
+"""
+Benchmark runner: every page, plus scripted interactions, at each data size.
+
+Each size runs in its own process, inside the dataset's working directory
+(see benchmarks/generate.py), so peak memory is per size and nothing is
+shared between sizes. The process times these stages:
+    build_snapshot        Parquet snapshot and text store from the CSV
+    <page>:cold           first run of a page (loads the dataset on the first page)
+    <page>:warm           the same page run again, with every cache warm
+    <page>:<step>         the rerun after each scripted interaction (benchmarks/scenarios.py)
+and records wall time and the process's peak resident memory after each one.
+
+Results go to benchmarks/results/<timestamp>.json and are compared with a
+stored baseline:
+    python -m benchmarks.generate --sizes 10k 100k
+    python -m benchmarks.run --sizes 10k 100k --save-baseline     # once, on a known-good tree
+    python -m benchmarks.run --sizes 10k 100k                     # after a change
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import subprocess
+import tempfile
+
+from benchmarks.generate import SIZES, WORK_DIR, generate, work_dir
+from benchmarks.scenarios import PAGES, SCENARIOS
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = 'benchmarks/results'
+BASELINE_PATH = 'benchmarks/baseline.json'
+
+# A stage only counts as a regression if it is this much slower than the
+# baseline, and by more than NOISE_SECONDS
+TOLERANCE = 0.25
+NOISE_SECONDS = 0.05
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_size(size, root=WORK_DIR, timeout=600):
+    """
+    Runs every stage for one dataset size in this process. Call it in a
+    fresh process (see `benchmark`); it changes the working directory.
+    """
+    os.chdir(os.path.join(REPO_ROOT, work_dir(size, root)))
+    sys.path.insert(0, REPO_ROOT)
+    from streamlit.testing.v1 import AppTest
+    from utils.data import SNAPSHOT_PATH, build_snapshot
+    from utils.search import SEARCH_INDEX_PATH
+    from utils.text_store import TEXT_STORE_PATH
+
+    # Start cold: nothing derived from the CSV is left over from an earlier run
+    for path in [SNAPSHOT_PATH, SEARCH_INDEX_PATH]:
+        if os.path.exists(path):
+            os.remove(path)
+    shutil.rmtree(TEXT_STORE_PATH, ignore_errors=True)
+
+    stages = []
+
+    def timed(stage, action):
+        start = time.perf_counter()
+        error = action()
+        stages.append({'stage': stage, 'seconds': time.perf_counter() - start,
+                       'peak_rss_mb': peak_rss_mb(), 'error': error})
+
+    def snapshot():
+        build_snapshot()
+
+    def run_page(at):
+        at.run()
+        return '; '.join(e.value for e in at.exception) or None
+
+    timed('build_snapshot', snapshot)
+    for page in PAGES:
+        at = AppTest.from_file(os.path.join(REPO_ROOT, page), default_timeout=timeout)
+        timed(f'{page}:cold', lambda: run_page(at))
+        timed(f'{page}:warm', lambda: run_page(at))
+        for step, action in SCENARIOS.get(page, []):
+            action(at)
+            timed(f'{page}:{step}', lambda: run_page(at))
+    return {'size': size, 'rows': SIZES[size], 'peak_rss_mb': peak_rss_mb(), 'stages': stages}
+
+
+def benchmark(size, root=WORK_DIR, timeout=600):
+    """
+    Runs one size in a fresh subprocess and returns its results.
+    """
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+        out = f.name
+    try:
+        worker = subprocess.run([sys.executable, '-m', 'benchmarks.run', '--worker', size, '--root', root,
+                                 '--timeout', str(timeout), '--out', out],
+                                cwd=REPO_ROOT, capture_output=True, text=True)
+        if worker.returncode != 0:
+            raise RuntimeError(f"Benchmark for {size} failed:\n{worker.stderr[-4000:]}")
+        with open(out) as f:
+            return json.load(f)
+    finally:
+        os.remove(out)
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """
+    One row per (size, stage) found in both runs, with the time ratio and
+    whether it counts as a regression.
+    """
+    rows = []
+    for size, run in results.items():
+        if size not in baseline:
+            continue
+        before = {s['stage']: s for s in baseline[size]['stages']}
+        for stage in run['stages']:
+            old = before.get(stage['stage'])
+            if old is None:
+                continue
+            ratio = stage['seconds'] / old['seconds'] if old['seconds'] else float('inf')
+            regressed = ratio > 1 + tolerance and stage['seconds'] - old['seconds'] > NOISE_SECONDS
+            rows.append({'size': size, 'stage': stage['stage'], 'baseline': old['seconds'],
+                         'seconds': stage['seconds'], 'ratio': ratio, 'regressed': regressed})
+        rss_ratio = run['peak_rss_mb'] / baseline[size]['peak_rss_mb']
+        rows.append({'size': size, 'stage': 'peak_rss_mb', 'baseline': baseline[size]['peak_rss_mb'],
+                     'seconds': run['peak_rss_mb'], 'ratio': rss_ratio, 'regressed': rss_ratio > 1 + tolerance})
+    return rows
+
+
+def print_report(results, comparison=None):
+    for size, run in results.items():
+        print(f"\n{size} ({run['rows']:,} rows), peak RSS {run['peak_rss_mb']:,.0f} MB")
+        for stage in run['stages']:
+            error = f"  ERROR: {stage['error']}" if stage['error'] else ''
+            print(f"  {stage['stage']:<60} {stage['seconds']:8.3f}s {stage['peak_rss_mb']:8.0f} MB{error}")
+    if comparison:
+        print("\nAgainst baseline:")
+        for row in comparison:
+            flag = '  REGRESSION' if row['regressed'] else ''
+            print(f"  {row['size']:<5} {row['stage']:<60} {row['baseline']:9.3f} -> {row['seconds']:9.3f}"
+                  f"  ({row['ratio']:.2f}x){flag}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark every page at synthetic data sizes.')
+    parser.add_argument('--sizes', nargs='+', default=['10k'], choices=list(SIZES))
+    parser.add_argument('--root', default=WORK_DIR)
+    parser.add_argument('--timeout', type=int, default=600, help='seconds allowed per page run')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    parser.add_argument('--strict', action='store_true', help='exit with status 1 on any regression')
+    parser.add_argument('--worker', choices=list(SIZES), help=argparse.SUPPRESS)
+    parser.add_argument('--out', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        with open(args.out, 'w') as f:
+            json.dump(run_size(args.worker, args.root, args.timeout), f)
+        sys.exit(0)
+
+    results = {}
+    for size in args.sizes:
+        csv_path = os.path.join(work_dir(size, args.root), 'data', 'final_dataset.csv')
+        if not os.path.exists(csv_path):
+            print(f"Generating {size} dataset...")
+            generate(SIZES[size], csv_path)
+        print(f"Running {size}...")
+        results[size] = benchmark(size, args.root, args.timeout)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out = os.path.join(RESULTS_DIR, time.strftime('%Y%m%d-%H%M%S') + '.json')
+    with open(out, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    comparison = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            comparison = compare(results, json.load(f), args.tolerance)
+    print_report(results, comparison)
+    print(f"\nWrote {out}")
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+    if args.strict and comparison and any(row['regressed'] for row in comparison):
+        sys.exit(1)
@@ -0,0 +1,72 @@
+# This was written with the help of Claude AI, but substantial written text is mine.
+
+"""
+Scripted widget interactions for each page.
+
+Each step is a (name, action) pair; the action changes widgets on an
+AppTest and the runner times the rerun that follows. Widgets are found by
+their label, so the scripts don't break when a widget is added above them.
+"""
+
+PAGES = ['Home_Page.py', 'pages/01_Methodology.py', 'pages/02_Interactive_Visualizations.py',
+         'pages/03_Summary_and_Ethics.py']
+
+
+def widget(elements, label):
+    for element in elements:
+        if element.label == label:
+            return element
+    raise LookupError(f"No widget labelled {label!r}")
+
+
+def _year_range(at):
+    slider = widget(at.slider, "Year Range:")
+    lo, hi = slider.min, slider.max
+    slider.set_value((lo + (hi - lo) // 4, hi - (hi - lo) // 4))
+
+
+def _fewer_countries(at):
+    countries = widget(at.multiselect, "Select Countries to Display:")
+    countries.set_value(countries.value[:3])
+
+
+def _heatmap_types(at):
+    widget(at.checkbox, "Other").uncheck()
+
+
+def _confidence(at):
+    slider = widget(at.slider, "Confidence Threshold:")
+    slider.set_value(round((slider.min + slider.max) / 2, 2))
+
+
+def _explorer_filters(at):
+    widget(at.multiselect, "Fiction:").set_value(['speculative'])
+    widget(at.radio, "Source:").set_value('Ground Truth')
+
+
+def _search(at):
+    widget(at.text_input, "Search:").set_value('novel')
+
+
+def _sort(at):
+    widget(at.selectbox, "Sort by:").set_value('label')
+    widget(at.radio, "Order:").set_value('Ascending')
+
+
+def _next_page(at):
+    page = next(w for w in at.number_input if w.label.startswith("Page"))
+    page.set_value(min(2, page.max))
+
+
+SCENARIOS = {
+    'pages/02_Interactive_Visualizations.py': [
+        ('year_range', _year_range),
+        ('fewer_countries', _fewer_countries),
+        ('heatmap_types', _heatmap_types),
+        ('confidence', _confidence),
+        ('explorer_filters', _explorer_filters),
+        ('search', _search),
+        ('sort', _sort),
+        ('next_page', _next_page),
+    ],
+}
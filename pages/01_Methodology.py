@@ -2,20 +2,25 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+
+from utils.page_export import page_content
+from utils.profiling import end_run, stage, start_run
 
 st.set_page_config(page_title="Methodology", page_icon="", layout="wide")
 
-# Load data from session state
-if 'data' not in st.session_state:
-    st.error("Data not loaded. Please return to Home page first.")
-    st.stop()
+# Per-rerun timings, shown in the sidebar when NOVELS_PROFILE is set
+start_run('Methodology')
+stage('load')
 
-df = st.session_state['data']
-df_classified = df[df['fiction_type'].notna()].copy()
+# Counts, model results, tables and figures, computed from the shared dataset (with
+# figures cached across sessions), or read from the precomputed export in static mode
+content = page_content('methodology')
+collection = content['collection']
+metrics = content['metrics']
+results = content['results']
+figures = content['figures']
 
-colors = {'speculative': '#e74c3c', 'realistic': '#3498db', 'other': '#95a5a6'}
+stage('render')
 
 st.title("Methodology & Classification")
 st.markdown("---")
@@ -26,13 +31,13 @@ st.markdown("**Source:** Wikidata queries")
 
 col1, col2, col3, col4 = st.columns(4)
 with col1:
-    st.metric("Total", len(df))
+    st.metric("Total", collection['total'])
 with col2:
-    st.metric("With Genres", len(df[df['genre'].notna()]))
+    st.metric("With Genres", collection['with_genres'])
 with col3:
-    st.metric("With Descriptions", len(df[df['description'].notna()]))
+    st.metric("With Descriptions", collection['with_descriptions'])
 with col4:
-    st.metric("Countries", df['country_grouped'].nunique())
+    st.metric("Countries", collection['countries'])
 
 st.markdown("---")
 
@@ -50,17 +55,11 @@ Note: The visualization below shows the distribution after running the model on
 novels with sufficient text.
 """)
 
-fiction_dist = df_classified['fiction_type'].value_counts()
-fig = px.bar(x=fiction_dist.index, y=fiction_dist.values, color=fiction_dist.index,
-            color_discrete_map=colors, title='Fiction Type Distribution')
-st.plotly_chart(fig, use_container_width=True, key="method1")
+st.plotly_chart(figures['method1'], use_container_width=True, key="method1")
 
 st.subheader("2.2 Literary Period")
-period_table = pd.DataFrame({
-    'Period': ['Classical', 'Romantic', 'Victorian', 'Modernist', 'Postwar', 'Contemporary', 'Modern'],
-    'Years': ['< 1800', '1800-1836', '1837-1900', '1901-1944', '1945-1969', '1970-1999', '2000+']
-})
-st.table(period_table)
+# Same boundaries the periods are binned with (utils/normalize.py)
+st.table(pd.DataFrame(**content['period_table']))
 
 st.subheader("2.3 Text Features")
 st.markdown("In terms of text to analyze, I used a combinations of a novel's title, description, " \
@@ -72,64 +71,75 @@ st.markdown("---")
 # Classification
 st.header("3. Text Classification")
 
-st.markdown("""
+st.markdown(f"""
 For genre classification, I split novels into one of three categories: speculative, realistic, or other, based
 on their given genre. I trained two models: one with text only, and one with text + period. 
 
-I filtered the dataset for novels where the cleaned text contained at least 15 characters. This removed novels whose text
+I filtered the dataset for novels where the cleaned text contained more than 15 characters. This removed novels whose text
 consisted mostly of metadata like author names and publication years. For feature extraction, however, I used the original text 
 to keep any words wrongly classified as proper nouns due to capitalization (in the case of novel titles). 
 
 
-**Breakdown:** Speculative vs. Realistic (248 novels, 80/20 split)
+**Breakdown:** Speculative vs. Realistic ({metrics['n_novels']} novels, {100 - metrics['test_size'] * 100:.0f}/{metrics['test_size'] * 100:.0f} split)
 
 **Model Used:** Random Forest (n=200, depth=20)
 
 **Features:** CountVectorizer (1000 features) + Literary Period
 """)
+if metrics.get('trained_at'):
+    st.caption(f"Results from retraining on the current data ({metrics['trained_at'][:10]}). The split and setup "
+               "match the original analysis, but the numbers can differ slightly from the write-up "
+               "(69.4% and 75.8%).")
 
 col1, col2 = st.columns(2)
 with col1:
-    st.markdown("**Model 1: Text Only** - Accuracy: **69.4%**")
+    st.markdown(f"**Model 1: Text Only** - Accuracy: **{results['text_only']:.1f}%**")
 with col2:
-    st.markdown("**Model 2: Text + Period** - Accuracy: **75.8%** (+6.4%)")
+    st.markdown(f"**Model 2: Text + Period** - Accuracy: **{results['text_period']:.1f}%** ({results['diff']:+.1f}%)")
+
+st.plotly_chart(figures['method2'], use_container_width=True, key="method2")
 
-results = pd.DataFrame({'Model': ['Text Only', 'Text + Period'], 'Accuracy': [69.4, 75.8]})
+# Cross-validation results, present once the runner has been run
+cv = content['cv']
+if cv:
+    st.subheader(f"Cross-Validation ({cv['n_splits']} folds)")
+    col1, col2 = st.columns(2)
+    for col, name, title in [(col1, 'text_only', 'Text Only'), (col2, 'text_period', 'Text + Period')]:
+        with col:
+            summary = cv['summary'][name]
+            st.metric(f"{title} Accuracy", f"{summary['accuracy_mean'] * 100:.1f}%",
+                      delta=f"± {summary['accuracy_std'] * 100:.1f}%", delta_color="off")
 
-fig = go.Figure(data=[
-    go.Bar(x=results['Model'], y=results['Accuracy'], marker_color=['#3498db', '#2ecc71'],
-           text=results['Accuracy'].apply(lambda x: f'{x}%'), textposition='outside')
-])
-fig.add_hline(y=50, line_dash="dash", line_color="red", annotation_text="Baseline")
-fig.update_layout(title='Model Performance', yaxis_range=[0, 100], height=400)
-st.plotly_chart(fig, use_container_width=True, key="method2")
+    st.dataframe(pd.DataFrame(**cv['folds']).rename_axis('Fold'), use_container_width=True)
 
 # Confusion Matrix
 st.subheader("Confusion Matrix for Model 2")
 
-confusion_data = {
-    'Predicted Realistic': [13, 0],
-    'Predicted Speculative': [15, 34]
-}
-confusion_df = pd.DataFrame(confusion_data, index=['Actually Realistic', 'Actually Speculative'])
+model2 = metrics['models']['text_period']
+confusion_df = pd.DataFrame(model2['confusion'],
+                            index=[f'Actually {label.title()}' for label in model2['labels']],
+                            columns=[f'Predicted {label.title()}' for label in model2['labels']])
 
-confusion_pct = confusion_df.div(confusion_df.sum(axis=1), axis=0) * 100
+st.plotly_chart(figures['method3'], use_container_width=True, key="method3")
 
-fig = px.imshow(confusion_pct.values, x=['Realistic', 'Speculative'], y=['Realistic', 'Speculative'],
-               color_continuous_scale='Blues', text_auto='.1f',
-               labels=dict(color="Percentage (%)"), title='Confusion Matrix (% of actual class)')
-fig.update_layout(height=400)
-st.plotly_chart(fig, use_container_width=True, key="method3")
+spec_hits = confusion_df.loc['Actually Speculative', 'Predicted Speculative']
+spec_total = confusion_df.loc['Actually Speculative'].sum()
+real_hits = confusion_df.loc['Actually Realistic', 'Predicted Realistic']
+real_total = confusion_df.loc['Actually Realistic'].sum()
+spec_predicted = confusion_df['Predicted Speculative'].sum()
+n_test = confusion_df.values.sum()
+train_share = metrics['train_share']
+favored = 'speculative' if spec_predicted / n_test > train_share['speculative'] else 'realistic'
 
 col1, col2 = st.columns(2)
 with col1:
-    st.markdown("""
+    st.markdown(f"""
     **Interpretation:**
-    - We see a  100% recall on speculative fiction (34/34)
-    - We see a 46.4% recall on realistic fiction (13/28)
-    - The model predicts speculative 79% of time (49/62)
-    - In the training data, 56% speculative, 44% realistic
-    - Therefore, the model favors speculative
+    - We see a  {spec_hits / spec_total * 100:.3g}% recall on speculative fiction ({spec_hits}/{spec_total})
+    - We see a {real_hits / real_total * 100:.1f}% recall on realistic fiction ({real_hits}/{real_total})
+    - The model predicts speculative {spec_predicted / n_test * 100:.0f}% of time ({spec_predicted}/{n_test})
+    - In the training data, {train_share['speculative'] * 100:.0f}% speculative, {train_share['realistic'] * 100:.0f}% realistic
+    - Therefore, the model favors {favored}
     """)
 with col2:
     st.dataframe(confusion_df)
@@ -139,7 +149,7 @@ st.markdown("---")
 # Hypothesis Testing
 st.header("4. Hypothesis Testing")
 
-st.markdown("""
+st.markdown(f"""
 **Test:** McNemar's test (for paired predictions)
 
 **H₀:** Period does NOT improve classification
@@ -147,22 +157,45 @@ st.markdown("""
 **H₁:** Period DOES improve classification
 
 **Test Results:**
-- Test statistic: 0.0000
-- p-value: 0.5000
-- Significance level (α): 0.05
+- Test statistic: {results['statistic']:.4f}
+- p-value: {results['p_value']:.4f}
+- Significance level (α): {results['alpha']}
 """)
 
 col1, col2, col3 = st.columns(3)
 with col1:
-    st.metric("Observed Difference", "6.4%")
+    st.metric("Observed Difference", f"{results['diff']:.1f}%")
 with col2:
-    st.metric("p-value", "0.5000")
+    st.metric("p-value", f"{results['p_value']:.4f}")
 with col3:
-    st.metric("α", "0.05")
+    st.metric("α", f"{results['alpha']}")
+
+# Bootstrap and permutation results, present once the training pipeline has been run
+significance = metrics.get('significance')
+if significance:
+    boot = significance['bootstrap']
+    perm = significance['permutation']
+    st.markdown(f"""
+**Resampling Checks:**
+- Bootstrap {boot['confidence']:.0%} confidence interval for the accuracy difference: 
+  [{boot['ci_low'] * 100:+.1f}%, {boot['ci_high'] * 100:+.1f}%] ({boot['n_resamples']:,} resamples)
+- Permutation test p-value: {perm['p_value']:.4f} ({perm['n_permutations']:,} permutations)
+""")
 
-st.markdown("""
-**Result:** Fail to reject null hypothesis (p = 0.5000 > 0.05)
+    st.plotly_chart(figures['method4'], use_container_width=True, key="method4")
+
+if results['significant']:
+    st.markdown(f"""
+**Result:** Reject null hypothesis (p = {results['p_value']:.4f} < {results['alpha']})
+
+Model 2 had a different accuracy than Model 1 ({results['text_period']:.1f}% vs {results['text_only']:.1f}%), and the difference is statistically significant.
+""")
+else:
+    st.markdown(f"""
+**Result:** Fail to reject null hypothesis (p = {results['p_value']:.4f} > {results['alpha']})
+
+Although Model 2 had a {'higher' if results['diff'] > 0 else 'lower'} accuracy than Model 1 ({results['text_period']:.1f}% vs {results['text_only']:.1f}%), the {'improvement' if results['diff'] > 0 else 'drop'} is not statistically significant.
+Again, this suggests that the {'increase' if results['diff'] > 0 else 'decrease'} in accuracy may be due to chance.
+""")
 
-Although Model 2 had a higher accuracy than Model 1 (75.8% vs 69.4%), the improvement is not statistically significant.
-Again, this suggests that the increase in accuracy may be due to chance.
-""")
\ No newline at end of file
+end_run()
@@ -1,21 +1,33 @@
 # This was written with the help of Claude AI, but substantial written text is mine.
 
 import streamlit as st
-import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 
+from utils.dataset import get_dataset
+from utils.figure_cache import get_figure_cache
+from utils.profiling import end_run, stage, start_run
+from utils.rendering import density_sample, is_large
+from utils.search import parse_query
+
 st.set_page_config(page_title="Interactive Visualizations", page_icon="", layout="wide")
 
-# Load data from session state
-if 'data' not in st.session_state:
-    st.error("Data not loaded. Please return to Home page first.")
-    st.stop()
+# Per-rerun timings, shown in the sidebar when NOVELS_PROFILE is set
+start_run('Interactive Visualizations')
+stage('load')
+
+# Shared, read-only dataset (loaded once per server process)
+dataset = get_dataset()
+df = dataset.frame
+df_classified = dataset.classified
+cube = dataset.cube
 
-df = st.session_state['data']
-df_classified = df[df['fiction_type'].notna()].copy()
+# Built figures are cached across sessions and reruns
+figures = get_figure_cache()
 
 colors = {'speculative': '#e74c3c', 'realistic': '#3498db', 'other': '#95a5a6'}
+classified = {'fiction_type': ['speculative', 'realistic', 'other']}
 
 st.title("Interactive Visualizations")
 st.markdown("---")
@@ -23,28 +35,35 @@ st.markdown("---")
 # VIZ 1: Timeline with slider
 st.header("1. Timeline Explorer")
 
-min_year = int(df_classified['publication_year'].min())
-max_year = int(df_classified['publication_year'].max())
+stage('plot:timeline')
+years = dataset.year_index
+min_year = int(years.min_year)
+max_year = int(years.max_year)
 year_range = st.slider("Year Range:", min_year, max_year, (min_year, max_year), 10)
 
-df_filtered = df_classified[
-    (df_classified['publication_year'] >= year_range[0]) &
-    (df_classified['publication_year'] <= year_range[1])
-]
-
 col1, col2 = st.columns([3, 1])
 with col1:
-    fig = px.histogram(df_filtered, x='publication_year', color='fiction_type', nbins=50,
-                      title=f'Novels ({year_range[0]}-{year_range[1]})',
-                      color_discrete_map=colors, barmode='stack')
-    fig.update_layout(height=500)
+    def build_timeline():
+        bins = years.histogram(year_range[0], year_range[1], nbins=50)
+        fig = go.Figure()
+        for ftype in ['speculative', 'realistic', 'other']:
+            fig.add_trace(go.Bar(
+                name=ftype, x=bins['start'] + bins['width'] / 2, y=bins[ftype], width=bins['width'],
+                marker_color=colors[ftype]
+            ))
+        fig.update_layout(title=f'Novels ({year_range[0]}-{year_range[1]})', barmode='stack', bargap=0,
+                          xaxis_title='publication_year', yaxis_title='count',
+                          legend_title_text='fiction_type', height=500)
+        return fig
+
+    fig = figures.figure(dataset.version, 'viz1', {'year_range': year_range}, build_timeline)
     st.plotly_chart(fig, use_container_width=True, key="viz1")
 
 with col2:
-    st.metric("Total", len(df_filtered))
-    st.metric("Speculative", len(df_filtered[df_filtered['fiction_type']=='speculative']))
-    st.metric("Realistic", len(df_filtered[df_filtered['fiction_type']=='realistic']))
-    st.metric("Other", len(df_filtered[df_filtered['fiction_type']=='other']))
+    st.metric("Total", years.count(*year_range))
+    st.metric("Speculative", years.count(*year_range, ftype='speculative'))
+    st.metric("Realistic", years.count(*year_range, ftype='realistic'))
+    st.metric("Other", years.count(*year_range, ftype='other'))
 
 st.markdown("---")
 
@@ -58,18 +77,22 @@ st.markdown("""
 - **United States**: Includes "United States" and "United States of America"
 """)
 
-top_countries = df_classified['country_consolidated'].value_counts().head(15).index.tolist()
+stage('plot:countries')
+top_countries = cube.value_counts('country_consolidated', where=classified).head(15).index.tolist()
 selected = st.multiselect("Select Countries to Display:", top_countries, default=top_countries)
 
 if selected:
-    df_geo = df_classified[df_classified['country_consolidated'].isin(selected)]
-    
-    country_counts = pd.crosstab(df_geo['country_consolidated'], df_geo['fiction_type'])
-    country_counts = country_counts.loc[country_counts.sum(axis=1).sort_values(ascending=False).index]
-    
-    fig = px.bar(country_counts, barmode='group', title='Fiction Types by Country',
-                color_discrete_map=colors, height=500)
-    fig.update_layout(xaxis_tickangle=-45)
+    def build_country_chart():
+        country_counts = cube.crosstab('country_consolidated', 'fiction_type',
+                                       where={**classified, 'country_consolidated': selected})
+        country_counts = country_counts.loc[country_counts.sum(axis=1).sort_values(ascending=False).index]
+
+        fig = px.bar(country_counts, barmode='group', title='Fiction Types by Country',
+                    color_discrete_map=colors, height=500)
+        fig.update_layout(xaxis_tickangle=-45)
+        return fig
+
+    fig = figures.figure(dataset.version, 'viz2a', {'countries': selected}, build_country_chart)
     st.plotly_chart(fig, use_container_width=True, key="viz2a")
 
 st.markdown("---")
@@ -85,28 +108,97 @@ with col2:
 with col3:
     show_other = st.checkbox("Other", True)
 
+stage('plot:heatmap')
 types = []
 if show_spec: types.append('speculative')
 if show_real: types.append('realistic')
 if show_other: types.append('other')
 
 if types:
-    df_hm = df_classified[df_classified['fiction_type'].isin(types)]
-    top10 = df_hm['country_consolidated'].value_counts().head(10).index
-    df_hm = df_hm[df_hm['country_consolidated'].isin(top10)]
-    
-    heatmap = pd.crosstab(df_hm['literary_period'], df_hm['country_consolidated'])
-    fig = px.imshow(heatmap.values, x=heatmap.columns, y=heatmap.index,
-                   color_continuous_scale='YlOrRd', text_auto=True,
-                   title='Period × Country Heatmap')
-    fig.update_layout(height=500)
-    fig.update_xaxes(tickangle=-45)
+    def build_heatmap():
+        top10 = cube.value_counts('country_consolidated', where={'fiction_type': types}).head(10).index.tolist()
+        heatmap = cube.crosstab('literary_period', 'country_consolidated',
+                                where={'fiction_type': types, 'country_consolidated': top10})
+        fig = px.imshow(heatmap.values, x=heatmap.columns, y=heatmap.index,
+                       color_continuous_scale='YlOrRd', text_auto=True,
+                       title='Period × Country Heatmap')
+        fig.update_layout(height=500)
+        fig.update_xaxes(tickangle=-45)
+        return fig
+
+    fig = figures.figure(dataset.version, 'viz3', {'types': types}, build_heatmap)
     st.plotly_chart(fig, use_container_width=True, key="viz3")
 
 st.markdown("---")
 
-# VIZ 4: Explorer
-st.header("4. Novel Explorer")
+# VIZ 4: Prediction confidence
+st.header("4. Prediction Confidence")
+
+st.markdown("""
+Novels without a ground-truth genre were labelled by the Text + Period model. Raise the threshold to
+keep only the predictions the model was most confident about; ground-truth labels are always kept.
+""")
+
+stage('plot:confidence')
+confidence = dataset.confidence_index
+low = float(np.floor(confidence.min_confidence * 100) / 100)
+high = float(np.ceil(confidence.max_confidence * 100) / 100)
+threshold = st.slider("Confidence Threshold:", low, max(high, low + 0.01), low, 0.01)
+
+# Every count below is a binary search and prefix-sum lookup, not a refilter of the rows
+type_totals = confidence.counts(threshold)
+kept = confidence.kept(threshold)
+labelled = int(type_totals.sum())
+
+col1, col2, col3, col4, col5 = st.columns(5)
+with col1:
+    st.metric("Labelled Novels", labelled)
+with col2:
+    st.metric("Predictions Kept", f"{kept} of {confidence.n_predicted}")
+with col3:
+    st.metric("Predicted Share", f"{kept / labelled * 100:.1f}%" if labelled else "–")
+with col4:
+    st.metric("Speculative Share", f"{type_totals['speculative'] / labelled * 100:.1f}%" if labelled else "–")
+with col5:
+    st.metric("Realistic Share", f"{type_totals['realistic'] / labelled * 100:.1f}%" if labelled else "–")
+
+col1, col2 = st.columns(2)
+with col1:
+    def build_confidence_periods():
+        period_counts = confidence.counts(threshold, 'literary_period')
+        period_counts = period_counts[period_counts.sum(axis=1) > 0]
+        period_pct = period_counts.div(period_counts.sum(axis=1), axis=0) * 100
+        fig = go.Figure()
+        for ftype in ['realistic', 'speculative', 'other']:
+            fig.add_trace(go.Bar(name=ftype, x=period_pct.index.astype(str), y=period_pct[ftype],
+                                 marker_color=colors[ftype]))
+        fig.update_layout(title='Fiction Type by Literary Period (%)', barmode='stack',
+                          xaxis_title='literary_period', yaxis_title='percent', height=450)
+        return fig
+
+    fig = figures.figure(dataset.version, 'viz4a', {'threshold': threshold}, build_confidence_periods)
+    st.plotly_chart(fig, use_container_width=True, key="viz4a")
+
+with col2:
+    def build_confidence_decades():
+        # Solid bars are ground truth, hatched bars the predictions kept at this threshold
+        fig = go.Figure()
+        for source, name, pattern in [('ground_truth', 'ground truth', ''), ('predicted', 'predicted', '/')]:
+            decade_counts = confidence.counts(threshold, 'decade', source=source)
+            for ftype in ['realistic', 'speculative', 'other']:
+                fig.add_trace(go.Bar(name=f'{ftype} ({name})', x=decade_counts.index, y=decade_counts[ftype],
+                                     marker_color=colors[ftype], marker_pattern_shape=pattern))
+        fig.update_layout(title='Novels by Decade and Source', barmode='stack',
+                          xaxis_title='decade', yaxis_title='count', height=450)
+        return fig
+
+    fig = figures.figure(dataset.version, 'viz4b', {'threshold': threshold}, build_confidence_decades)
+    st.plotly_chart(fig, use_container_width=True, key="viz4b")
+
+st.markdown("---")
+
+# VIZ 5: Explorer
+st.header("5. Novel Explorer")
 
 col1, col2, col3, col4 = st.columns(4)
 with col1:
@@ -122,26 +214,83 @@ with col3:
 with col4:
     source = st.radio("Source:", ['All', 'Ground Truth', 'Predicted'])
 
-df_exp = df_classified[
-    (df_classified['fiction_type'].isin(fiction_filter)) &
-    (df_classified['literary_period'].isin(period_filter))
-]
+stage('filter:explorer')
+sources = {'All': None, 'Ground Truth': [False], 'Predicted': [True]}
+explorer_state = {
+    'fiction_type': fiction_filter,
+    'literary_period': period_filter,
+    'country_consolidated': country_filter or None,
+    'is_predicted': sources[source],
+}
+rows = dataset.explorer_index.select(explorer_state)
+
+query = st.text_input("Search:", placeholder="Title, author or words from the description")
+ranked = None
+if query.strip():
+    # Index lookups give rows best match first; keep those that pass the filters
+    ranked = dataset.search.search(query)
+    ranked = ranked[np.isin(ranked, rows)]
+    rows = np.sort(ranked)
+    # Keyed by what the search matched on: "love" and "love " select different rows
+    explorer_state['query'] = parse_query(query)
 
-if country_filter:
-    df_exp = df_exp[df_exp['country_consolidated'].isin(country_filter)]
+st.markdown(f"**Showing {len(rows)} novels**")
 
-if source == 'Ground Truth':
-    df_exp = df_exp[df_exp['is_predicted'] == False]
-elif source == 'Predicted':
-    df_exp = df_exp[df_exp['is_predicted'] == True]
+stage('plot:scatter')
 
-st.markdown(f"**Showing {len(df_exp)} novels**")
+def build_scatter():
+    # Large results switch to WebGL and a density-preserving sample of the points
+    large = is_large(len(rows))
+    plot_rows = rows
+    if large:
+        plot_rows = rows[density_sample(df_classified['publication_year'].to_numpy()[rows],
+                                        df_classified['fiction_type'].to_numpy()[rows])]
+    df_plot = df_classified.iloc[plot_rows]
+    fig = px.scatter(df_plot, x='publication_year', y='fiction_type', color='fiction_type',
+                    hover_data=['label', 'author'], color_discrete_map=colors, opacity=0.6,
+                    render_mode='webgl' if large else 'auto')
+    fig.update_layout(height=400)
+    if large:
+        fig.update_layout(title=f'Sample of {len(plot_rows):,} of {len(rows):,} novels (density-preserving)')
+    return fig
 
-fig = px.scatter(df_exp, x='publication_year', y='fiction_type', color='fiction_type',
-                hover_data=['label', 'author'], color_discrete_map=colors, opacity=0.6)
-fig.update_layout(height=400)
+fig = figures.figure(dataset.version, 'viz5', explorer_state, build_scatter)
 st.plotly_chart(fig, use_container_width=True, key="viz5")
 
-st.dataframe(df_exp[['label', 'author', 'fiction_type', 'publication_year', 
-                     'literary_period', 'country_consolidated']].sort_values('publication_year', ascending=False).head(50),
-            use_container_width=True)
\ No newline at end of file
+stage('table:explorer')
+# Only the rows on the visible page are sorted into place and materialized
+table_columns = ['label', 'author', 'fiction_type', 'publication_year', 'literary_period', 'country_consolidated']
+page_size = 50
+n_pages = dataset.table.n_pages(len(rows), page_size)
+
+col1, col2, col3 = st.columns(3)
+sort_options = (['relevance'] if ranked is not None else []) + table_columns
+with col1:
+    sort_by = st.selectbox("Sort by:", sort_options, index=0 if ranked is not None else sort_options.index('publication_year'))
+with col2:
+    order = st.radio("Order:", ['Descending', 'Ascending'], horizontal=True)
+with col3:
+    page = st.number_input(f"Page (of {n_pages}):", min_value=1, max_value=n_pages, value=1,
+                           key=f"explorer_page_{n_pages}")
+
+if sort_by == 'relevance':
+    # Best match first, so "Descending" keeps the index's order
+    ordered = ranked if order == 'Descending' else ranked[::-1]
+    page_rows = ordered[(page - 1) * page_size:page * page_size]
+else:
+    page_rows = dataset.table.page(rows, sort_by, ascending=(order == 'Ascending'), page=page - 1, page_size=page_size)
+df_table = df_classified.iloc[page_rows]
+st.dataframe(df_table[table_columns], use_container_width=True)
+
+stage('render:details')
+# Text is only read from the text store for the one novel being viewed
+if len(df_table):
+    labels = dict(zip(df_table['qid'], df_table['label']))
+    qid = st.selectbox("Novel Details:", list(labels), format_func=lambda q: labels[q])
+    details = dataset.text.get_many([qid], ['description', 'first_line', 'last_line', 'epigraph']).iloc[0]
+    st.markdown(f"**{labels[qid]}** — {details['description'] or 'No description'}")
+    for field, name in [('first_line', 'First line'), ('last_line', 'Last line'), ('epigraph', 'Epigraph')]:
+        if details[field]:
+            st.markdown(f"*{name}:* {details[field]}")
+
+end_run()
@@ -1,25 +1,41 @@
 # This was written with the help of Claude AI, but substantial written text is mine.
 
 import streamlit as st
-import pandas as pd
+
+from utils.page_export import page_content
+from utils.profiling import end_run, stage, start_run
 
 st.set_page_config(page_title="Summary and Ethics", page_icon="", layout="wide")
 
-# Load data from session state
-if 'data' not in st.session_state:
-    st.error("Data not loaded. Please return to Home page first.")
-    st.stop()
+# Per-rerun timings, shown in the sidebar when NOVELS_PROFILE is set
+start_run('Summary and Ethics')
+stage('load')
 
-df = st.session_state['data']
+# Model results (this page doesn't need the dataset), computed from the metrics
+# artifact or read from the precomputed export in static mode
+content = page_content('summary')
+results = content['results']
+train_share = content['train_share']
+recall = content['recall']
 
+stage('render')
 st.title("Summary and Ethics")
 st.markdown("---")
 
 st.markdown("### Summary")
 
-st.markdown("""
-    - 6.4% accuracy increase observed but was not statistically significant
-    - 75.8% model accuracy remains above a 50% baseline of random guessing
+if results['significant']:
+    st.markdown(f"""
+    - {abs(results['diff']):.1f}% accuracy {'increase' if results['diff'] > 0 else 'decrease'} observed and was statistically significant
+    - {results['text_period']:.1f}% model accuracy remains above a 50% baseline of random guessing
+    - Speculative fiction seems to have grown in 20th century
+    - Relationship exists visually, and period improves prediction
+    - Geographic/cultural biases in dataset
+    """)
+else:
+    st.markdown(f"""
+    - {abs(results['diff']):.1f}% accuracy {'increase' if results['diff'] > 0 else 'decrease'} observed but was not statistically significant
+    - {results['text_period']:.1f}% model accuracy remains above a 50% baseline of random guessing
     - Speculative fiction seems to have grown in 20th century
     - Relationship exists visually, but period doesn't improve prediction
     - Geographic/cultural biases in dataset
@@ -30,12 +46,12 @@ st.markdown("---")
 # Limitations
 st.header("Limitations")
 
-st.markdown("""
+st.markdown(f"""
 **1. Class Imbalance**
             
-The training data consisted of 56% speculative novels and 44% realistic novels, so 
+The training data consisted of {train_share['speculative'] * 100:.0f}% speculative novels and {train_share['realistic'] * 100:.0f}% realistic novels, so 
 the model was likely biased toward speculative fiction. This is reflected by the model's
-high recall for speculative (100%) and low recall for realistic (46%). If I had more time, I might
+high recall for speculative ({recall['speculative']:.0f}%) and low recall for realistic ({recall['realistic']:.0f}%). If I had more time, I might
 try to use class weights to see if this could improve the model.
 
 **2. Sample Size**
@@ -72,4 +88,6 @@ st.markdown("""
 - Binary genre classification (speculative vs. realistic) might ignore non-Western novels
 - Binary classification oversimplifies more complex novels
 - Wikidata itself reflects bias towards English language/Western novels
-""")
\ No newline at end of file
+""")
+
+end_run()
@@ -0,0 +1,54 @@
+# This was written with the help of Claude AI, but substantial written text is mine.
+
+"""
+The Novel Explorer scatter must plot the rows the search selected. Figures
+are cached process-wide by widget state, so "love" and "love " (prefix vs.
+exact match on the last word) must not share a cache entry.
+"""
+
+import os
+import json
+import base64
+
+import numpy as np
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGE = os.path.join(ROOT, 'pages', '02_Interactive_Visualizations.py')
+
+
+@pytest.fixture(scope='module')
+def app():
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        at = AppTest.from_file(PAGE, default_timeout=120)
+        at.run()
+        yield at
+    finally:
+        os.chdir(cwd)
+
+
+def _length(values):
+    # Plotly serializes numeric arrays as {'dtype': ..., 'bdata': <base64>}
+    if isinstance(values, dict):
+        return len(base64.b64decode(values['bdata'])) // np.dtype(values['dtype']).itemsize
+    return len(values or [])
+
+
+def _points(at):
+    # The explorer scatter is the last chart on the page
+    spec = json.loads(at.get('plotly_chart')[-1].proto.spec)
+    return sum(_length(trace.get('x')) for trace in spec['data'])
+
+
+@pytest.mark.parametrize('queries', [['love', 'love '], ['star', 'star ']])
+def test_scatter_matches_table(app, queries):
+    for query in queries:
+        app.text_input[0].input(query).run()
+        assert not app.exception
+        table = app.dataframe[-1].value
+        assert len(table) < 50, 'query should fit on one table page'
+        assert _points(app) == len(table), query
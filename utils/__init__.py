@@ -0,0 +1,6 @@
+# This was written with the help of Claude AI, but substantial written text is mine.
+
+"""
+Shared helpers for loading and preparing the novel dataset.
+The Streamlit pages import from here so every page works off the same data.
+"""
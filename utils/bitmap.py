@@ -0,0 +1,63 @@
+# This was written with the help of Claude AI, but substantial written text is mine.
+
+"""
+Bitmap index for the Novel Explorer filters.
+
+For each categorical column, one packed bitset (1 bit per row) is built per
+value. A filter combination is answered by OR-ing the bitsets of the selected
+values within a column and AND-ing across columns, and only the matching row
+positions are returned. No intermediate DataFrames are created.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class BitmapIndex:
+    """
+    Packed per-value bitsets over a fixed set of rows.
+    """
+
+    def __init__(self, df, columns):
+        self.n_rows = len(df)
+        self.bitmaps = {}
+        for col in columns:
+            cat = pd.Categorical(df[col])
+            codes = cat.codes
+            # Group row positions by code with one sort instead of one scan per value
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(cat.categories) + 1))
+            self.bitmaps[col] = {}
+            for k, value in enumerate(cat.categories):
+                bits = np.zeros(self.n_rows, dtype=bool)
+                bits[order[bounds[k]:bounds[k + 1]]] = True
+                self.bitmaps[col][value] = np.packbits(bits)
+        self._all = np.packbits(np.ones(self.n_rows, dtype=bool))
+        self._none = np.zeros_like(self._all)
+
+    def match(self, col, values):
+        """
+        Packed bitset of rows whose value in `col` is any of `values`.
+        """
+        bits = self._none.copy()
+        for value in values:
+            if value in self.bitmaps[col]:
+                np.bitwise_or(bits, self.bitmaps[col][value], out=bits)
+        return bits
+
+    def select(self, filters):
+        """
+        Row positions matching every filter. `filters` maps a column to the
+        allowed values; a value of None leaves that column unfiltered.
+        """
+        bits = self._all.copy()
+        for col, values in filters.items():
+            if values is not None:
+                np.bitwise_and(bits, self.match(col, values), out=bits)
+        return np.flatnonzero(np.unpackbits(bits, count=self.n_rows))
+
+    def nbytes(self):
+        """
+        Memory held by all bitsets.
+        """
+        return sum(bits.nbytes for col in self.bitmaps.values() for bits in col.values())
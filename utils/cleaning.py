@@ -0,0 +1,281 @@
+# This was written with the help of Claude AI, but substantial written text is mine.
+
+"""
+Text cleaning that produces the `text_filtered` column.
+
+`text` (title, description, and first line, last line and epigraph where
+available) is lower-cased with numbers and proper nouns removed, so the
+classifier can't just memorize names. Proper nouns are found with a rule
+rather than a part-of-speech tagger: a capitalized word that doesn't start
+a sentence is dropped, unless it is a common function word ("It", "I",
+"When", ...). Punctuation is kept as separate tokens. The original column
+was made with a tagger, so the output is close to it but not identical.
+
+The CSV is streamed in chunks and each chunk's texts are cleaned in a
+process pool. Results are cached by a hash of the text (and the cleaner
+version), so rerunning after a data pull only cleans new or changed novels.
+Rows whose cleaned text is not longer than MIN_TEXT_LENGTH characters are
+flagged as not eligible for training, as described on the Methodology page.
+
+The output goes to its own artifact. The CSV's text_filtered column holds
+the tagger's output, which the heuristic matches exactly on only about a
+third of rows (and it moves about 15% of novels across the length cutoff),
+so --update-csv only fills in rows that have no text_filtered yet, such
+as new novels from a data pull. Replacing the tagger's output as well
+needs --overwrite, and it changes the training set.
+
+Run with:
+    python -m utils.cleaning                             # writes artifacts/text_filtered.parquet
+    python -m utils.cleaning --update-csv                # also fills missing text_filtered in the CSV
+    python -m utils.cleaning --update-csv --overwrite    # replaces every row's text_filtered (lossy)
+"""
+
+import os
+import re
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.data import CSV_PATH
+from utils.training import MIN_TEXT_LENGTH, has_enough_text
+
+OUTPUT_PATH = 'artifacts/text_filtered.parquet'
+CACHE_PATH = 'artifacts/clean_cache.parquet'
+
+# Bump when the cleaning rules change, so cached results are redone
+CLEANER_VERSION = 1
+
+# Words, numbers and single punctuation marks; apostrophes split words ("herald's" -> herald, s)
+TOKEN_PATTERN = re.compile(r"[^\W\d_]+(?:[-\u2010\u2013\u2014][^\W\d_]+)*|\d[\d.,]*|[^\w\s'\u2018\u2019]")
+SENTENCE_END = {'.', '!', '?'}
+
+NUMBER_WORDS = {
+    'zero', 'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten', 'eleven',
+    'twelve', 'thirteen', 'fourteen', 'fifteen', 'sixteen', 'seventeen', 'eighteen', 'nineteen',
+    'twenty', 'thirty', 'forty', 'fifty', 'sixty', 'seventy', 'eighty', 'ninety', 'hundred',
+    'thousand', 'million', 'billion',
+}
+
+# Capitalized adjectives like "Japanese" or "English" are kept
+DEMONYM_SUFFIXES = ('ese', 'ian', 'ish', 'can')
+
+# Capitalized words that are kept anywhere in a sentence
+FUNCTION_WORDS = {
+    'i', 'me', 'my', 'we', 'us', 'our', 'you', 'your', 'he', 'him', 'his', 'she', 'her', 'it', 'its',
+    'they', 'them', 'their', 'this', 'that', 'these', 'those', 'the', 'a', 'an', 'and', 'or', 'but',
+    'nor', 'so', 'yet', 'if', 'when', 'while', 'where', 'why', 'how', 'what', 'who', 'whom', 'which',
+    'as', 'at', 'by', 'for', 'from', 'in', 'into', 'of', 'on', 'to', 'with', 'without', 'about',
+    'after', 'before', 'under', 'over', 'not', 'no', 'is', 'am', 'are', 'was', 'were', 'be', 'been',
+    'do', 'does', 'did', 'have', 'has', 'had', 'will', 'would', 'shall', 'should', 'can', 'could',
+    'may', 'might', 'must', 'there', 'then', 'here', 'all', 'some', 'every',
+}
+
+
+def clean_text(text):
+    """
+    Lower-cased text with numbers and (likely) proper nouns removed.
+    """
+    if not isinstance(text, str):
+        return ''
+    tokens = TOKEN_PATTERN.findall(text)
+    kept = []
+    sentence_start = True
+    skip_period = False
+    for i, token in enumerate(tokens):
+        lower = token.lower()
+        if skip_period:
+            skip_period = False
+            if token == '.':
+                continue
+        if token[0].isdigit() or lower in NUMBER_WORDS:
+            sentence_start = False
+            continue
+        if token[0].isalpha():
+            if token[0].isupper() and len(token) == 1 and lower not in FUNCTION_WORDS \
+                    and i + 1 < len(tokens) and tokens[i + 1] == '.':
+                # An initial ("S. E. Hinton"); its period doesn't end a sentence
+                skip_period = True
+                continue
+            if token[0].isupper() and not sentence_start and lower not in FUNCTION_WORDS \
+                    and not lower.endswith(DEMONYM_SUFFIXES):
+                continue
+            sentence_start = False
+        else:
+            sentence_start = token in SENTENCE_END
+        kept.append(lower)
+    return ' '.join(kept)
+
+
+def clean_texts(texts):
+    """
+    Cleans a batch of texts (runs in a worker process).
+    """
+    return [clean_text(text) for text in texts]
+
+
+def text_hashes(texts):
+    """
+    64-bit hash per text (of the cleaner version and the text), for the cache.
+    """
+    salt = f"{CLEANER_VERSION}\0".encode('utf-8')
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(salt + ('' if t is None else str(t)).encode('utf-8'),
+                                        digest_size=8).digest(), 'little') for t in texts),
+        dtype=np.uint64, count=len(texts))
+
+
+class CleanCache:
+    """
+    Cleaned text by text hash: a sorted hash array and the matching texts.
+    """
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.texts = np.empty(0, dtype=object)
+        if os.path.exists(path):
+            table = pq.read_table(path)
+            self.hashes = table.column('hash').to_numpy()
+            self.texts = table.column('text_filtered').to_numpy(zero_copy_only=False)
+        self._new_hashes = []
+        self._new_texts = []
+        self._used = []
+
+    def lookup(self, hashes):
+        """
+        Cached text per hash (None where missing).
+        """
+        found = np.full(len(hashes), None, dtype=object)
+        if len(self.hashes):
+            i = np.minimum(np.searchsorted(self.hashes, hashes), len(self.hashes) - 1)
+            hit = self.hashes[i] == hashes
+            found[hit] = self.texts[i[hit]]
+        self._used.append(hashes)
+        return found
+
+    def add(self, hashes, texts):
+        self._new_hashes.append(np.asarray(hashes, dtype=np.uint64))
+        self._new_texts.append(np.asarray(texts, dtype=object))
+
+    def save(self):
+        """
+        Writes the entries used in this run (old or new); stale entries are dropped.
+        """
+        hashes = np.concatenate([self.hashes] + self._new_hashes)
+        texts = np.concatenate([self.texts] + self._new_texts)
+        hashes, first = np.unique(hashes, return_index=True)
+        texts = texts[first]
+        if self._used:
+            keep = np.isin(hashes, np.concatenate(self._used))
+            hashes, texts = hashes[keep], texts[keep]
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        pq.write_table(pa.table({'hash': hashes, 'text_filtered': pa.array(texts, type=pa.string())}), self.path)
+
+
+def _batches(items, n_batches):
+    size = max(1, -(-len(items) // n_batches))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def clean_csv(csv_path=CSV_PATH, out_path=OUTPUT_PATH, cache_path=CACHE_PATH, chunksize=50_000, n_jobs=None):
+    """
+    Streams `text` out of the CSV, cleans what isn't cached and writes qid,
+    text_filtered and eligible (cleaned text is long enough) to `out_path`.
+    Returns (rows, rows cleaned this run, eligible rows).
+    """
+    cache = CleanCache(cache_path)
+    n_jobs = n_jobs or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=n_jobs) if n_jobs > 1 else None
+    os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+    writer = None
+    n_rows = n_cleaned = n_eligible = 0
+    try:
+        for chunk in pd.read_csv(csv_path, usecols=['qid', 'text'], chunksize=chunksize):
+            texts = chunk['text'].to_numpy(dtype=object)
+            hashes = text_hashes(texts)
+            cleaned = cache.lookup(hashes)
+
+            missing = np.flatnonzero(pd.isna(cleaned))
+            if len(missing):
+                # Identical texts in the chunk are only cleaned once
+                new_hashes, first, inverse = np.unique(hashes[missing], return_index=True, return_inverse=True)
+                todo = list(texts[missing[first]])
+                if pool is None:
+                    results = clean_texts(todo)
+                else:
+                    results = [t for batch in pool.map(clean_texts, _batches(todo, n_jobs)) for t in batch]
+                results = np.array(results, dtype=object)
+                cleaned[missing] = results[inverse]
+                cache.add(new_hashes, results)
+                n_cleaned += len(todo)
+
+            eligible = has_enough_text(cleaned)
+            table = pa.table({'qid': chunk['qid'].astype(str).to_numpy(),
+                              'text_filtered': pa.array(cleaned, type=pa.string()),
+                              'eligible': eligible})
+            if writer is None:
+                writer = pq.ParquetWriter(out_path, table.schema)
+            writer.write_table(table)
+            n_rows += len(chunk)
+            n_eligible += int(eligible.sum())
+    finally:
+        if writer is not None:
+            writer.close()
+        if pool is not None:
+            pool.shutdown()
+    cache.save()
+    return n_rows, n_cleaned, n_eligible
+
+
+def update_csv(csv_path=CSV_PATH, cleaned_path=OUTPUT_PATH, overwrite=False, chunksize=50_000):
+    """
+    Writes the cleaned output into the CSV's text_filtered column, in chunks,
+    and swaps the new file in when it is complete. Only rows without a
+    text_filtered are filled, unless `overwrite` is set. Returns the number
+    of rows written.
+    """
+    cleaned = pq.ParquetFile(cleaned_path).iter_batches(batch_size=chunksize, columns=['text_filtered'])
+    tmp_path = csv_path + '.tmp'
+    pending = []
+    n_written = 0
+    for i, chunk in enumerate(pd.read_csv(csv_path, chunksize=chunksize)):
+        values = []
+        while len(values) < len(chunk):
+            if not pending:
+                pending = next(cleaned).column(0).to_pylist()
+            take = len(chunk) - len(values)
+            values.extend(pending[:take])
+            pending = pending[take:]
+        fill = np.ones(len(chunk), dtype=bool) if overwrite else chunk['text_filtered'].isna().to_numpy()
+        current = chunk['text_filtered'].to_numpy(dtype=object)
+        chunk['text_filtered'] = np.where(fill, np.array(values, dtype=object), current)
+        n_written += int(fill.sum())
+        chunk.to_csv(tmp_path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+    os.replace(tmp_path, csv_path)
+    return n_written
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Clean the text column into text_filtered.')
+    parser.add_argument('--csv', default=CSV_PATH)
+    parser.add_argument('--out', default=OUTPUT_PATH)
+    parser.add_argument('--cache', default=CACHE_PATH)
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: every core)')
+    parser.add_argument('--update-csv', action='store_true', help='fill missing text_filtered values in the CSV')
+    parser.add_argument('--overwrite', action='store_true',
+                        help="with --update-csv, also replace the tagger's text_filtered (lossy)")
+    args = parser.parse_args()
+    if args.overwrite and not args.update_csv:
+        parser.error('--overwrite only applies with --update-csv')
+
+    n_rows, n_cleaned, n_eligible = clean_csv(args.csv, args.out, args.cache, n_jobs=args.jobs)
+    print(f"{n_rows} rows ({n_cleaned} cleaned, {n_rows - n_cleaned} from cache); "
+          f"{n_eligible} have more than {MIN_TEXT_LENGTH} characters")
+    if args.update_csv:
+        n_written = update_csv(args.csv, args.out, overwrite=args.overwrite)
+        print(f"Wrote text_filtered for {n_written} rows of {args.csv}")
@@ -0,0 +1,106 @@
+# This was written with the help of Claude AI, but substantial written text is mine.
+
+"""
+Confidence-threshold index for the prediction confidence explorer.
+
+Predicted labels are kept only when their prediction_confidence is at least
+the chosen threshold; ground-truth labels are always kept. Confidences are
+rounded to CONFIDENCE_DECIMALS and their distinct values sorted once, with
+cumulative counts per (label, fiction type) kept for each value, for every
+dimension in the index. A threshold is then one binary search, and every
+count is a difference of prefix sums. Rounding caps the table at 10^d + 1
+rows however large the dataset is.
+"""
+
+import numpy as np
+import pandas as pd
+
+CONFIDENCE_DECIMALS = 3
+
+
+class ConfidenceIndex:
+    """
+    Prefix sums of predicted novels per dimension label and fiction type,
+    ordered by prediction confidence, plus fixed ground-truth counts.
+    """
+
+    def __init__(self, df, types, dims=('literary_period', 'decade')):
+        self.types = list(types)
+        type_codes = pd.Categorical(df['fiction_type'], categories=self.types).codes.astype(np.int64)
+        predicted = df['is_predicted'].to_numpy(dtype=bool)
+        confidence = df['prediction_confidence'].to_numpy(dtype=float)
+
+        # Predictions without a confidence can't pass any threshold
+        pred = predicted & ~np.isnan(confidence) & (type_codes >= 0)
+        truth = ~predicted & (type_codes >= 0)
+        self.values, inverse = np.unique(np.round(confidence[pred], CONFIDENCE_DECIMALS), return_inverse=True)
+        self.n_predicted = int(pred.sum())
+
+        self.labels = {}
+        self._cumulative = {}
+        self._truth = {}
+        for dim in (None,) + tuple(dims):
+            if dim is None:
+                codes, n_labels = np.zeros(len(df), dtype=np.int64), 1
+            else:
+                cat = pd.Categorical(df[dim])
+                codes = cat.codes.astype(np.int64)
+                # Missing values get the last slot
+                codes[codes < 0] = len(cat.categories)
+                n_labels = len(cat.categories) + 1
+                self.labels[dim] = list(cat.categories)
+            n_cells = n_labels * len(self.types)
+            cells = codes * len(self.types) + type_codes
+
+            per_value = np.bincount(inverse * n_cells + cells[pred],
+                                    minlength=len(self.values) * n_cells).reshape(len(self.values), n_cells)
+            cumulative = np.zeros((len(self.values) + 1, n_cells), dtype=np.int64)
+            np.cumsum(per_value, axis=0, out=cumulative[1:])
+            self._cumulative[dim] = cumulative
+            self._truth[dim] = np.bincount(cells[truth], minlength=n_cells)
+
+    def nbytes(self):
+        """
+        Memory held by the confidence values, prefix sums and ground-truth counts.
+        """
+        arrays = [self.values, *self._cumulative.values(), *self._truth.values()]
+        return sum(a.nbytes for a in arrays)
+
+    @property
+    def min_confidence(self):
+        return float(self.values[0]) if len(self.values) else 0.0
+
+    @property
+    def max_confidence(self):
+        return float(self.values[-1]) if len(self.values) else 1.0
+
+    def _predicted(self, dim, threshold):
+        """
+        Predicted counts per cell with confidence at least `threshold`.
+        """
+        cumulative = self._cumulative[dim]
+        below = np.searchsorted(self.values, round(threshold, CONFIDENCE_DECIMALS), side='left')
+        return cumulative[-1] - cumulative[below]
+
+    def kept(self, threshold):
+        """
+        Number of predictions at or above the threshold.
+        """
+        return int(self._predicted(None, threshold).sum())
+
+    def counts(self, threshold, dim=None, source=None):
+        """
+        Novels per fiction type at this threshold, as a Series, or per label
+        of `dim` and fiction type, as a DataFrame (missing labels dropped).
+        `source` is 'predicted', 'ground_truth' or None for both.
+        """
+        cells = np.zeros_like(self._truth[dim])
+        if source in (None, 'predicted'):
+            cells = cells + self._predicted(dim, threshold)
+        if source in (None, 'ground_truth'):
+            cells = cells + self._truth[dim]
+        table = cells.reshape(-1, len(self.types))
+        if dim is None:
+            return pd.Series(table[0], index=pd.Index(self.types, name='fiction_type'), name='count')
+        return pd.DataFrame(table[:-1], index=pd.Index(self.labels[dim], name=dim),
+                            columns=pd.Index(self.types, name='fiction_type'))
@@ -0,0 +1,127 @@
+# This was written with the help of Claude AI, but substantial written text is mine.
+
+"""
+Repeatable k-fold cross-validation of the Text-Only and Text + Period models.
+
+The single 80/20 split on the Methodology page is noisy, so this runner
+evaluates both models on every fold of a stratified k-fold split. Text
+features for each fold are vectorized once and cached on disk, keyed by the
+dataset hash, number of folds and fold seed, so reruns only retrain. Folds
+are evaluated in parallel, one worker process per fold.
+
+Run with:
+    python -m utils.cross_validation --folds 5
+"""
+
+import os
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import sparse
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import StratifiedKFold
+
+from utils.data import CSV_PATH, dataset_version
+from utils.metrics import CV_PATH
+from utils.training import (CLASSES, MAX_FEATURES, MODEL_PARAMS, add_period, load_training_frame,
+                            model_metrics, text_features)
+
+CACHE_DIR = 'artifacts/cv_cache'
+
+
+def fold_cache_dir(version, n_splits, seed, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"{version}-k{n_splits}-s{seed}-f{MAX_FEATURES}")
+
+
+def cache_fold_features(df, fold, train_idx, test_idx, directory):
+    """
+    Vectorizes one fold (fit on its training rows only) and saves the CSR
+    matrices, labels and periods, unless they are already cached.
+    """
+    prefix = os.path.join(directory, f"fold{fold}")
+    if os.path.exists(prefix + '_meta.npz'):
+        return
+    train, test = df.iloc[train_idx], df.iloc[test_idx]
+    X_train, X_test, _ = text_features(train['text'].fillna(''), test['text'].fillna(''))
+    sparse.save_npz(prefix + '_train.npz', X_train)
+    sparse.save_npz(prefix + '_test.npz', X_test)
+    # Written last, so a fold only counts as cached once everything is on disk
+    np.savez(prefix + '_meta.npz',
+             y_train=train['fiction_type'].to_numpy(dtype=str), y_test=test['fiction_type'].to_numpy(dtype=str),
+             period_train=train['literary_period'].to_numpy(dtype=str),
+             period_test=test['literary_period'].to_numpy(dtype=str))
+
+
+def _evaluate_fold(args):
+    """
+    Trains and scores both models on one cached fold (runs in a worker).
+    """
+    directory, fold, seed = args
+    prefix = os.path.join(directory, f"fold{fold}")
+    X_train = sparse.load_npz(prefix + '_train.npz')
+    X_test = sparse.load_npz(prefix + '_test.npz')
+    meta = np.load(prefix + '_meta.npz')
+
+    scores = {'fold': fold, 'n_test': len(meta['y_test'])}
+    inputs = {
+        'text_only': (X_train, X_test),
+        'text_period': (add_period(X_train, meta['period_train']), add_period(X_test, meta['period_test'])),
+    }
+    for name, (train, test) in inputs.items():
+        # One process per fold already, so each forest builds its trees serially
+        model = RandomForestClassifier(**MODEL_PARAMS, random_state=seed, n_jobs=1)
+        model.fit(train, meta['y_train'])
+        scores[name] = model_metrics(meta['y_test'], model.predict(test))
+    return scores
+
+
+def run_cross_validation(csv_path=CSV_PATH, n_splits=5, seed=42, n_jobs=None, cache_dir=CACHE_DIR):
+    """
+    Per-fold accuracy, recall and confusion matrices for both models, plus
+    the mean and standard deviation of accuracy across folds.
+    """
+    df = load_training_frame(csv_path)
+    version = dataset_version(csv_path)
+    directory = fold_cache_dir(version, n_splits, seed, cache_dir)
+    os.makedirs(directory, exist_ok=True)
+
+    splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=seed)
+    for fold, (train_idx, test_idx) in enumerate(splitter.split(df, df['fiction_type'])):
+        cache_fold_features(df, fold, train_idx, test_idx, directory)
+
+    tasks = [(directory, fold, seed) for fold in range(n_splits)]
+    if n_jobs == 1:
+        folds = [_evaluate_fold(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            folds = list(pool.map(_evaluate_fold, tasks))
+
+    summary = {}
+    for name in ['text_only', 'text_period']:
+        accuracy = np.array([f[name]['accuracy'] for f in folds])
+        summary[name] = {
+            'accuracy_mean': float(accuracy.mean()),
+            'accuracy_std': float(accuracy.std(ddof=1)) if len(accuracy) > 1 else 0.0,
+            'confusion': np.sum([f[name]['confusion'] for f in folds], axis=0).tolist(),
+        }
+    return {'dataset_version': version, 'n_splits': n_splits, 'seed': seed, 'n_novels': len(df),
+            'labels': CLASSES, 'folds': folds, 'summary': summary}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Cross-validate the Text-Only and Text + Period models.')
+    parser.add_argument('--csv', default=CSV_PATH)
+    parser.add_argument('--out', default=CV_PATH)
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: every core)')
+    args = parser.parse_args()
+
+    results = run_cross_validation(args.csv, args.folds, args.seed, args.jobs)
+    os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+    with open(args.out, 'w') as f:
+        json.dump(results, f, indent=2)
+    for name, summary in results['summary'].items():
+        print(f"{name}: {summary['accuracy_mean']:.1%} ± {summary['accuracy_std']:.1%}")
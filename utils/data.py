@@ -0,0 +1,197 @@
+# This was written with the help of Claude AI, but substantial written text is mine.
+
+"""
+Loading and preprocessing for the novel dataset.
+
+The CSV is the source of truth, but parsing it as text is slow once the
+dataset gets large. `build_snapshot` writes a typed, columnar Parquet copy
+that already holds the derived columns, and `load_dataset` reads that copy
+whenever it is present and up to date. The snapshot records the dataset
+version and the normalization tables it was derived with (see
+utils/normalize.py); if only the tables changed, the derived columns are
+recomputed from the snapshot instead of reparsing the CSV.
+
+Batch predictions (utils/inference.py) can be written into the snapshot
+without touching the CSV. The snapshot then also records a hash of those
+predictions, and `read_dataset` returns it with the frame, so that
+anything keyed by the dataset version (figures, the search index, the
+page export) is keyed by both (see `frame_version`).
+
+Only the columns the pages use are loaded (HOT_COLUMNS). The large free-text
+columns go into a separate store keyed by qid (see utils/text_store.py).
+
+Build the snapshot with:
+    python -m utils.data
+"""
+
+import os
+import json
+import hashlib
+import argparse
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pandas.api.types import union_categoricals
+
+from utils.normalize import assign_periods, consolidate_countries, fingerprint, period_order
+from utils.text_store import TEXT_STORE_PATH, build_text_store
+
+CSV_PATH = 'data/final_dataset.csv'
+SNAPSHOT_PATH = 'data/final_dataset.parquet'
+
+# Chronological ordering for literary periods
+PERIOD_ORDER = period_order()
+
+# CSV columns kept in memory; everything else stays on disk.
+# literary_period is derived from publication_year, so it isn't read.
+HOT_COLUMNS = ['qid', 'label', 'author', 'genre', 'publication_year',
+               'country_grouped', 'fiction_type', 'is_predicted', 'prediction_confidence']
+
+# Low-cardinality text columns stored as categoricals in the snapshot
+CATEGORICAL_COLUMNS = ['fiction_type', 'country_grouped', 'country_consolidated']
+
+# Key of the snapshot's Parquet metadata entry
+SNAPSHOT_METADATA_KEY = b'novels'
+
+
+def add_derived_columns(df):
+    """
+    Adds the decade, consolidated country and literary period columns
+    (see utils/normalize.py for the mapping tables).
+    """
+    df['decade'] = (df['publication_year'] // 10) * 10
+    df['country_consolidated'] = pd.Series(consolidate_countries(df['country_grouped']), index=df.index)
+    df['literary_period'] = pd.Series(assign_periods(df['publication_year']), index=df.index)
+
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
+    return df
+
+
+def append_rows(df, new_rows):
+    """
+    The frame with already-derived rows added at the end. Categorical
+    columns stay categorical, with the union of both sides' categories.
+    """
+    combined = pd.concat([df, new_rows], ignore_index=True)
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            combined[col] = union_categoricals([df[col], new_rows[col]], sort_categories=True)
+    combined['literary_period'] = combined['literary_period'].astype(df['literary_period'].dtype)
+    return combined
+
+
+def read_csv_dataset(path=CSV_PATH):
+    """
+    Parses the hot columns of the CSV (a path or file object) and adds the
+    derived columns.
+    """
+    # Parsed straight into categoricals, so later mappings only touch the categories
+    dtypes = {col: 'category' for col in CATEGORICAL_COLUMNS if col in HOT_COLUMNS}
+    return add_derived_columns(pd.read_csv(path, usecols=HOT_COLUMNS, dtype=dtypes))
+
+
+def snapshot_is_fresh(csv_path=CSV_PATH, snapshot_path=SNAPSHOT_PATH):
+    """
+    True when the snapshot exists and was built after the CSV was last changed.
+    """
+    if not os.path.exists(snapshot_path):
+        return False
+    if not os.path.exists(csv_path):
+        return True
+    return os.path.getmtime(snapshot_path) >= os.path.getmtime(csv_path)
+
+
+def text_store_dir(csv_path=CSV_PATH):
+    """
+    Directory of the text store for a CSV: TEXT_STORE_PATH for the dataset,
+    and <name>_text_store next to any other CSV, so two watched files never
+    write into the same store.
+    """
+    if os.path.abspath(csv_path) == os.path.abspath(CSV_PATH):
+        return TEXT_STORE_PATH
+    return os.path.splitext(csv_path)[0] + '_text_store'
+
+
+def build_snapshot(csv_path=CSV_PATH, snapshot_path=SNAPSHOT_PATH, text_store_path=None):
+    """
+    Parses the CSV once and writes the typed Parquet snapshot and the text
+    store (by default in the CSV's store directory, see `text_store_dir`).
+    """
+    df = read_csv_dataset(csv_path)
+    version = dataset_version(csv_path)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    info = json.dumps({'dataset_version': version, 'normalization': fingerprint()}).encode('utf-8')
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), SNAPSHOT_METADATA_KEY: info})
+    pq.write_table(table, snapshot_path)
+    build_text_store(csv_path, text_store_path or text_store_dir(csv_path), version=version)
+    return df
+
+
+def snapshot_info(snapshot_path=SNAPSHOT_PATH):
+    """
+    Dataset version and normalization fingerprint the snapshot was built with.
+    """
+    metadata = pq.read_schema(snapshot_path).metadata or {}
+    return json.loads(metadata.get(SNAPSHOT_METADATA_KEY, b'{}'))
+
+
+def dataset_version(csv_path=CSV_PATH):
+    """
+    Short content hash of the CSV, used to key anything derived from the data.
+    """
+    digest = hashlib.sha1()
+    with open(csv_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def frame_version(csv_version, predictions=None):
+    """
+    Version of a loaded frame: the CSV's, plus the hash of any predictions
+    written into the snapshot on top of it.
+    """
+    return f"{csv_version}+{predictions}" if predictions else csv_version
+
+
+def read_dataset(csv_path=CSV_PATH, snapshot_path=SNAPSHOT_PATH, version=None):
+    """
+    Like `load_dataset`, but also returns the hash of the predictions the
+    frame was loaded with (None when it came from the CSV alone).
+    """
+    if snapshot_is_fresh(csv_path, snapshot_path) and \
+            (version is None or snapshot_info(snapshot_path).get('dataset_version') == version):
+        # Data and metadata come from one read, so they always match
+        table = pq.read_table(snapshot_path)
+        info = json.loads((table.schema.metadata or {}).get(SNAPSHOT_METADATA_KEY, b'{}'))
+        if version is None or info.get('dataset_version') == version:
+            df = table.to_pandas()
+            if info.get('normalization') != fingerprint():
+                # Mapping tables changed since the snapshot was built
+                df = add_derived_columns(df)
+            return df, info.get('predictions')
+    return read_csv_dataset(csv_path), None
+
+
+def load_dataset(csv_path=CSV_PATH, snapshot_path=SNAPSHOT_PATH, version=None):
+    """
+    Loads the dataset from the snapshot if it is fresh (and, when `version`
+    is given, built from that dataset version), otherwise from the CSV.
+    """
+    return read_dataset(csv_path, snapshot_path, version)[0]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the typed Parquet snapshot of the novel dataset.')
+    parser.add_argument('--csv', default=CSV_PATH)
+    parser.add_argument('--out', default=SNAPSHOT_PATH)
+    parser.add_argument('--text-store', default=None, help=f'default: {TEXT_STORE_PATH} for {CSV_PATH}')
+    args = parser.parse_args()
+
+    store = args.text_store or text_store_dir(args.csv)
+    df = build_snapshot(args.csv, args.out, store)
+    print(f"Wrote {len(df)} rows to {args.out} and text to {store}")
@@ -0,0 +1,235 @@
+# This was written with the help of Claude AI, but substantial written text is mine.
+
+"""
+One read-only copy of the dataset, shared by every session and page.
+
+`st.cache_data` hands each session its own deserialized copy of the frame,
+so memory grows with the number of viewers. `get_dataset` uses
+`st.cache_resource` instead, which returns the same object to everyone.
+Large free-text columns are not part of the frame; look them up by qid
+through `text` (see utils/text_store.py).
+
+Pages must treat `frame` and `classified` as read-only: filter them, but
+never assign into them. (With pandas copy-on-write, filtered results never
+write back into the shared frame.)
+
+When rows are appended to the CSV, the next `get_dataset` call swaps in a
+new handle (see utils/refresh.py): only the new rows are parsed, the count
+cube is extended rather than rebuilt, and the new rows' text is added to
+the end of the text store. The other indexes (explorer bitmaps, year and
+confidence indexes, table sort keys, and the on-disk search index) are
+still rebuilt from the whole dataset on first use. Sessions in the middle
+of a rerun keep the handle they started with, so nobody waits on the
+refresh except the session that triggers it.
+"""
+
+import threading
+from functools import cached_property
+
+import pandas as pd
+import streamlit as st
+
+from utils.bitmap import BitmapIndex
+from utils.confidence_index import ConfidenceIndex
+from utils.cube import AggregateCube
+from utils.data import CSV_PATH, append_rows, frame_version, read_dataset, text_store_dir
+from utils.figure_cache import get_figure_cache
+from utils.profiling import span
+from utils.refresh import CsvWatcher
+from utils.search import open_search_index
+from utils.table import TablePager
+from utils.text_store import append_text_store, open_text_store
+from utils.year_index import YearIndex
+
+FICTION_TYPES = ['speculative', 'realistic', 'other']
+
+# Columns the Novel Explorer filters on
+EXPLORER_FILTERS = ['fiction_type', 'literary_period', 'country_consolidated', 'is_predicted']
+
+# Lazily built structures a handle can hold, each with an nbytes() method
+INDEXES = ['cube', 'explorer_index', 'year_index', 'confidence_index', 'table', 'text', 'search']
+
+
+class SharedDataset:
+    """
+    Immutable handle on the loaded dataset and its classified subset.
+    """
+
+    def __init__(self, frame, csv_version, csv_path=CSV_PATH, predictions=None):
+        self._frame = frame
+        # Rows with a fiction type, built once instead of per page and per rerun
+        self._classified = frame[frame['fiction_type'].notna()]
+        # The CSV the text store is built from, its version and the store's directory
+        self.csv_path = csv_path
+        self.text_store_path = text_store_dir(csv_path)
+        self.csv_version = csv_version
+        # Hash of the batch predictions the frame was loaded with, if any
+        self.predictions = predictions
+        # Key for everything derived from the frame
+        self.version = frame_version(csv_version, predictions)
+
+    @property
+    def frame(self):
+        return self._frame
+
+    @property
+    def classified(self):
+        return self._classified
+
+    @cached_property
+    def cube(self):
+        """
+        Count cube for the summary charts, built on first use.
+        """
+        with span('build:cube'):
+            return AggregateCube(self._frame)
+
+    @cached_property
+    def explorer_index(self):
+        """
+        Bitmap index over the classified rows for the Novel Explorer filters.
+        """
+        with span('build:explorer_index'):
+            return BitmapIndex(self._classified, EXPLORER_FILTERS)
+
+    @cached_property
+    def year_index(self):
+        """
+        Sorted year index with per-type prefix sums for the Timeline Explorer.
+        """
+        with span('build:year_index'):
+            return YearIndex(self._classified, FICTION_TYPES)
+
+    @cached_property
+    def confidence_index(self):
+        """
+        Confidence-sorted prefix sums for the prediction confidence explorer.
+        """
+        with span('build:confidence_index'):
+            return ConfidenceIndex(self._classified, FICTION_TYPES)
+
+    @cached_property
+    def table(self):
+        """
+        Sort keys and top-k paging over the classified rows for the explorer table.
+        """
+        with span('build:table'):
+            return TablePager(self._classified)
+
+    @cached_property
+    def text(self):
+        """
+        Memory-mapped store of the free-text columns, opened on first use.
+        """
+        with span('build:text'):
+            # Text only comes from the CSV, so predictions don't change it
+            return open_text_store(self.csv_path, self.text_store_path, version=self.csv_version)
+
+    @cached_property
+    def search(self):
+        """
+        Full-text index over the classified rows (document id = row position),
+        loaded from disk or built on first use.
+        """
+        with span('build:search'):
+            return open_search_index(self._classified, self.text, self.version)
+
+    def appended(self, new_rows, version, new_text=None):
+        """
+        A new handle with `new_rows` (already derived) added at the end, and
+        their text columns (`new_text`) added to the text store.
+        """
+        # Earlier rows keep their predictions, so the new handle's version keeps their hash
+        dataset = SharedDataset(append_rows(self._frame, new_rows), version, self.csv_path, self.predictions)
+        if 'cube' in self.__dict__:
+            # Count only the new rows instead of rebuilding the cube
+            dataset.__dict__['cube'] = self.cube.extended(new_rows)
+        if new_text is not None:
+            with span('refresh:text'):
+                # A store for another version is left alone; it is rebuilt when next opened
+                append_text_store(new_text, self.csv_version, version, self.text_store_path)
+        return dataset
+
+    def __len__(self):
+        return len(self._frame)
+
+    def memory_by_column(self):
+        """
+        Bytes held by each column of the full frame (strings counted deeply).
+        """
+        return self._frame.memory_usage(index=False, deep=True)
+
+    def memory_report(self):
+        """
+        Bytes per column for the full frame and the classified subset.
+        """
+        return pd.DataFrame({
+            'frame': self.memory_by_column(),
+            'classified': self._classified.memory_usage(index=False, deep=True),
+        })
+
+    def index_bytes(self):
+        """
+        Bytes held by each index built so far (indexes not yet used hold
+        nothing). The text store counts its mapped files.
+        """
+        return pd.Series({name: self.__dict__[name].nbytes()
+                          for name in INDEXES if name in self.__dict__}, dtype='int64')
+
+    def total_bytes(self):
+        """
+        Total size of everything this handle holds: both frames and every
+        index built so far.
+        """
+        return int(self.memory_report().to_numpy().sum() + self.index_bytes().sum())
+
+
+class LiveDataset:
+    """
+    Holds the current SharedDataset and swaps in a new one when the CSV changes.
+    """
+
+    def __init__(self, csv_path=CSV_PATH):
+        self.watcher = CsvWatcher(csv_path)
+        self.dataset = self._load(self.watcher.version)
+        self._lock = threading.Lock()
+
+    def _load(self, version):
+        frame, predictions = read_dataset(self.watcher.csv_path, version=version)
+        return SharedDataset(frame, version, self.watcher.csv_path, predictions)
+
+    def current(self):
+        # Only one session refreshes; the others keep using the current handle meanwhile
+        if self.watcher.changed() and self._lock.acquire(blocking=False):
+            try:
+                self.refresh()
+            finally:
+                self._lock.release()
+        return self.dataset
+
+    def refresh(self):
+        change = self.watcher.poll()
+        if change is None:
+            return
+        old = self.dataset
+        with span(f'refresh:{change.kind}'):
+            if change.kind == 'append':
+                self.dataset = old.appended(change.rows, change.version, change.text)
+            else:
+                self.dataset = self._load(change.version)
+        # Figures are keyed by version, so the old ones can never be hit again
+        get_figure_cache().discard_version(old.version)
+
+
+@st.cache_resource(show_spinner="Loading novels...")
+def get_live_dataset():
+    with span('load_dataset'):
+        return LiveDataset()
+
+
+def get_dataset():
+    """
+    The current dataset, loaded once per server process and shared across
+    sessions. Picks up changes to the CSV without a restart.
+    """
+    return get_live_dataset().current()
@@ -0,0 +1,125 @@
+# This was written with the help of Claude AI, but substantial written text is mine.
+
+"""
+Process-wide cache of built Plotly figures.
+
+Building `go.Figure`/`px.*` objects is a large part of the work on every
+rerun, even for charts that never change. Figures are cached as serialized
+JSON, keyed by (dataset version, chart id, normalized widget state), so a
+chart is only rebuilt the first time a given widget state is seen. The cache
+is a bounded LRU (by entries and by total JSON size) with hit/miss counters.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from utils.profiling import span
+
+
+def normalize_state(state):
+    """
+    Hashable, order-insensitive form of a widget state dict. Lists and sets
+    (e.g. multiselect values) are treated as sets; tuples keep their order
+    (e.g. slider ranges).
+    """
+    def normalize(value):
+        if isinstance(value, dict):
+            return tuple(sorted((str(k), normalize(v)) for k, v in value.items()))
+        if isinstance(value, (list, set, frozenset)):
+            return tuple(sorted((normalize(v) for v in value), key=repr))
+        if isinstance(value, tuple):
+            return tuple(normalize(v) for v in value)
+        if hasattr(value, 'item'):
+            return value.item()
+        return value
+    return normalize(state or {})
+
+
+class FigureCache:
+    """
+    Bounded LRU of figure JSON with hit/miss counters. Safe to share between
+    the threads that serve different sessions.
+    """
+
+    def __init__(self, max_entries=512, max_bytes=256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def figure(self, version, chart_id, state, build):
+        """
+        The figure for this chart and widget state, rebuilt from the cached
+        JSON. `build` is only called on a miss.
+        """
+        figure_json = self.figure_json(version, chart_id, state, build)
+        with span('figure:deserialize'):
+            # A go.Figure rather than the plain dict: st.plotly_chart rejects
+            # an empty dict (e.g. a scatter over no rows gives `data: []`)
+            return go.Figure(json.loads(figure_json))
+
+    def figure_json(self, version, chart_id, state, build):
+        """
+        The serialized figure for this chart and widget state.
+        """
+        key = (version, chart_id, normalize_state(state))
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if cached is None:
+            with span(f'figure:build:{chart_id}'):
+                fig = build()
+            with span('figure:serialize'):
+                cached = fig.to_json()
+            self._store(key, cached)
+        return cached
+
+    def _store(self, key, figure_json):
+        with self._lock:
+            self.misses += 1
+            if key in self._entries:
+                return
+            self._entries[key] = figure_json
+            self._bytes += len(figure_json)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def discard_version(self, version):
+        """
+        Drops every figure built from one dataset version.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == version]:
+                self._bytes -= len(self._entries.pop(key))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {'entries': len(self._entries), 'bytes': self._bytes, 'hits': self.hits,
+                    'misses': self.misses, 'evictions': self.evictions,
+                    'hit_rate': self.hits / total if total else 0.0}
+
+
+@st.cache_resource
+def get_figure_cache():
+    """
+    The one figure cache shared by every session and page.
+    """
+    return FigureCache()
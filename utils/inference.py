@@ -0,0 +1,324 @@
+# This was written with the help of Claude AI, but substantial written text is mine.
+
+"""
+Batch prediction of fiction types for novels without a ground-truth label.
+
+Novels without a fiction type, or whose type was predicted earlier, are
+labelled with the saved Text + Period model (`python -m utils.training`
+saves it). Ground-truth labels are never touched. As in training, only
+novels whose cleaned text is longer than MIN_TEXT_LENGTH characters are
+labelled; the rest are left unclassified.
+
+The CSV is streamed in chunks. Each novel's input (its text and literary
+period) is hashed together with the model's own hash, and predictions are
+cached by that hash, so after a data pull only new or changed novels, or
+every novel after retraining, are vectorized and scored. Scoring runs in
+a process pool, with the model loaded once per worker. What is incremental
+is the scoring: every run still reads and hashes the whole CSV.
+
+The predictions (fiction_type, is_predicted, prediction_confidence) are
+written into the Parquet snapshot (see utils/data.py; the snapshot is built
+first if it is missing or stale). A Parquet file can't be updated in place,
+so the whole snapshot is rewritten, but batches without a changed row are
+copied as they are, and nothing is written when no prediction changed. The
+snapshot records a hash of the predictions, which becomes part of the
+dataset version the app keys its figures and search index by, so nothing
+built from the old labels is reused. The app picks them up on its next
+start. With --update-csv they are also written into the CSV, so they
+survive the snapshot being rebuilt.
+
+Run with:
+    python -m utils.inference
+    python -m utils.inference --update-csv
+"""
+
+import os
+import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.data import (CSV_PATH, SNAPSHOT_METADATA_KEY, SNAPSHOT_PATH, build_snapshot, dataset_version,
+                        snapshot_info, snapshot_is_fresh)
+from utils.normalize import assign_periods
+from utils.training import MODEL_PATH, add_period, has_enough_text
+
+CACHE_PATH = 'artifacts/prediction_cache.parquet'
+
+PREDICTION_COLUMNS = ['fiction_type', 'is_predicted', 'prediction_confidence']
+
+# Set in each worker process by _init_worker
+_bundle = None
+
+
+def model_hash(path=MODEL_PATH):
+    """
+    Short content hash of the saved model, part of every cache key.
+    """
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def _init_worker(model_path):
+    global _bundle
+    _bundle = joblib.load(model_path)
+    # One process per worker already; the forest itself runs single-threaded
+    _bundle['model'].n_jobs = 1
+
+
+def score_batch(batch):
+    """
+    Fiction types and confidences for (texts, periods) (runs in a worker).
+    """
+    texts, periods = batch
+    X = _bundle['vectorizer'].transform(texts)
+    X = add_period(X, periods, _bundle['periods'])
+    proba = _bundle['model'].predict_proba(X)
+    best = proba.argmax(axis=1)
+    return _bundle['model'].classes_[best].tolist(), proba[np.arange(len(best)), best].tolist()
+
+
+def input_hashes(model_id, texts, periods):
+    """
+    64-bit hash per novel of the model hash, literary period and text.
+    """
+    salt = f"{model_id}\0".encode('utf-8')
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(salt + f"{period}\0{text}".encode('utf-8'), digest_size=8).digest(),
+                        'little') for text, period in zip(texts, periods)),
+        dtype=np.uint64, count=len(texts))
+
+
+class PredictionCache:
+    """
+    Prediction by input hash: a sorted hash array and the matching labels and confidences.
+    """
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.labels = np.empty(0, dtype=object)
+        self.confidence = np.empty(0, dtype=float)
+        if os.path.exists(path):
+            table = pq.read_table(path)
+            self.hashes = table.column('hash').to_numpy()
+            self.labels = table.column('fiction_type').to_numpy(zero_copy_only=False)
+            self.confidence = table.column('prediction_confidence').to_numpy()
+        self._new = []
+        self._used = []
+
+    def lookup(self, hashes):
+        """
+        Cached labels and confidences per hash (None and NaN where missing).
+        """
+        labels = np.full(len(hashes), None, dtype=object)
+        confidence = np.full(len(hashes), np.nan)
+        if len(self.hashes):
+            i = np.minimum(np.searchsorted(self.hashes, hashes), len(self.hashes) - 1)
+            hit = self.hashes[i] == hashes
+            labels[hit] = self.labels[i[hit]]
+            confidence[hit] = self.confidence[i[hit]]
+        self._used.append(hashes)
+        return labels, confidence
+
+    def add(self, hashes, labels, confidence):
+        self._new.append((np.asarray(hashes, dtype=np.uint64), np.asarray(labels, dtype=object),
+                          np.asarray(confidence, dtype=float)))
+
+    def save(self):
+        """
+        Writes the entries used in this run (old or new); stale entries are dropped.
+        """
+        hashes = np.concatenate([self.hashes] + [h for h, _, _ in self._new])
+        labels = np.concatenate([self.labels] + [l for _, l, _ in self._new])
+        confidence = np.concatenate([self.confidence] + [c for _, _, c in self._new])
+        hashes, first = np.unique(hashes, return_index=True)
+        labels, confidence = labels[first], confidence[first]
+        if self._used:
+            keep = np.isin(hashes, np.concatenate(self._used))
+            hashes, labels, confidence = hashes[keep], labels[keep], confidence[keep]
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        pq.write_table(pa.table({'hash': hashes, 'fiction_type': pa.array(labels, type=pa.string()),
+                                 'prediction_confidence': confidence}), self.path)
+
+
+def _batches(items, n_batches):
+    size = max(1, -(-len(items) // n_batches))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def predict_csv(csv_path=CSV_PATH, model_path=MODEL_PATH, cache_path=CACHE_PATH, chunksize=50_000, n_jobs=None):
+    """
+    Streams the CSV and predicts every novel that needs it, scoring only
+    inputs that aren't cached. Returns the updates as a DataFrame (row
+    position in the CSV and the three prediction columns; rows that can't
+    be labelled are cleared) and (candidates, scored this run).
+    """
+    model_id = model_hash(model_path)
+    cache = PredictionCache(cache_path)
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1:
+        _init_worker(model_path)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(model_path,))
+
+    updates = []
+    offset = n_candidates = n_scored = 0
+    columns = ['text', 'text_filtered', 'publication_year', 'fiction_type', 'is_predicted']
+    try:
+        for chunk in pd.read_csv(csv_path, usecols=columns, chunksize=chunksize):
+            # Ground-truth labels are kept; everything else is (re)predicted
+            candidate = (chunk['fiction_type'].isna() | chunk['is_predicted'].astype(bool)).to_numpy()
+            eligible = candidate & has_enough_text(chunk['text_filtered'])
+            positions = np.flatnonzero(eligible)
+            texts = chunk['text'].fillna('').to_numpy(dtype=object)[positions]
+            periods = np.asarray(assign_periods(chunk['publication_year'].to_numpy()[positions])).astype(object)
+
+            hashes = input_hashes(model_id, texts, periods)
+            labels, confidence = cache.lookup(hashes)
+            missing = np.flatnonzero(pd.isna(labels))
+            if len(missing):
+                # Identical inputs in the chunk are only scored once
+                new_hashes, first, inverse = np.unique(hashes[missing], return_index=True, return_inverse=True)
+                todo = missing[first]
+                batches = [(texts[b].tolist(), periods[b].tolist()) for b in _batches(todo, n_jobs)]
+                results = map(score_batch, batches) if pool is None else pool.map(score_batch, batches)
+                new_labels, new_confidence = [], []
+                for batch_labels, batch_confidence in results:
+                    new_labels.extend(batch_labels)
+                    new_confidence.extend(batch_confidence)
+                new_labels = np.array(new_labels, dtype=object)
+                new_confidence = np.array(new_confidence, dtype=float)
+                labels[missing] = new_labels[inverse]
+                confidence[missing] = new_confidence[inverse]
+                cache.add(new_hashes, new_labels, new_confidence)
+                n_scored += len(todo)
+
+            cleared = np.flatnonzero(candidate & ~eligible)
+            updates.append(pd.DataFrame({
+                'row': offset + np.concatenate([positions, cleared]),
+                'fiction_type': np.concatenate([labels, np.full(len(cleared), None, dtype=object)]),
+                'is_predicted': np.concatenate([np.ones(len(positions), dtype=bool),
+                                                np.zeros(len(cleared), dtype=bool)]),
+                'prediction_confidence': np.concatenate([confidence, np.full(len(cleared), np.nan)]),
+            }))
+            n_candidates += int(candidate.sum())
+            offset += len(chunk)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    cache.save()
+    updates = pd.concat(updates, ignore_index=True).sort_values('row', ignore_index=True)
+    return updates, n_candidates, n_scored
+
+
+def _apply(frame, updates, offset):
+    """
+    The updates that fall in rows [offset, offset + len(frame)), applied to a copy of `frame`.
+    Returns the frame and the number of rows whose values changed.
+    """
+    lo, hi = np.searchsorted(updates['row'].to_numpy(), [offset, offset + len(frame)])
+    part = updates.iloc[lo:hi]
+    rows = part['row'].to_numpy() - offset
+    frame = frame.copy()
+    before = frame[PREDICTION_COLUMNS].iloc[rows].astype(object).reset_index(drop=True)
+    frame['fiction_type'] = frame['fiction_type'].astype(object)
+    for col in PREDICTION_COLUMNS:
+        frame.iloc[rows, frame.columns.get_loc(col)] = part[col].to_numpy()
+    after = part[PREDICTION_COLUMNS].astype(object).reset_index(drop=True)
+    changed = ~((before == after) | (before.isna() & after.isna())).all(axis=1)
+    return frame, int(changed.sum())
+
+
+def predictions_hash(updates):
+    """
+    Short content hash of a run's predictions, recorded in the snapshot.
+    """
+    values = pd.util.hash_pandas_object(updates[['row'] + PREDICTION_COLUMNS], index=False)
+    return hashlib.sha1(values.to_numpy().tobytes()).hexdigest()[:12]
+
+
+def write_snapshot(updates, csv_path=CSV_PATH, snapshot_path=SNAPSHOT_PATH, batch_size=100_000):
+    """
+    Rewrites the snapshot batch by batch with the predictions applied, and
+    swaps the new file in when it is complete. The snapshot is left alone
+    when no row changes. Returns the number of rows changed.
+    """
+    if not snapshot_is_fresh(csv_path, snapshot_path) or \
+            snapshot_info(snapshot_path).get('dataset_version') != dataset_version(csv_path):
+        build_snapshot(csv_path, snapshot_path)
+
+    source = pq.ParquetFile(snapshot_path)
+    # Keeps the snapshot's column types and metadata (dataset version, normalization), plus the predictions hash
+    schema = source.schema_arrow
+    info = {**snapshot_info(snapshot_path), 'predictions': predictions_hash(updates)}
+    schema = schema.with_metadata({**schema.metadata, SNAPSHOT_METADATA_KEY: json.dumps(info).encode('utf-8')})
+    tmp_path = snapshot_path + '.tmp'
+    offset = n_changed = 0
+    with pq.ParquetWriter(tmp_path, schema) as writer:
+        for batch in source.iter_batches(batch_size=batch_size):
+            frame, changed = _apply(batch.to_pandas(), updates, offset)
+            if changed:
+                frame['fiction_type'] = frame['fiction_type'].astype('category')
+                writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+            else:
+                writer.write_table(pa.Table.from_batches([batch]).replace_schema_metadata(schema.metadata))
+            offset += batch.num_rows
+            n_changed += changed
+    if n_changed:
+        os.replace(tmp_path, snapshot_path)
+    else:
+        os.remove(tmp_path)
+    return n_changed
+
+
+def update_csv(updates, csv_path=CSV_PATH, chunksize=50_000):
+    """
+    Writes the predictions into the CSV, in chunks, and swaps the new file
+    in when it is complete. Returns the number of rows changed.
+    """
+    tmp_path = csv_path + '.tmp'
+    offset = n_changed = 0
+    for i, chunk in enumerate(pd.read_csv(csv_path, chunksize=chunksize)):
+        chunk, changed = _apply(chunk, updates, offset)
+        chunk.to_csv(tmp_path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+        offset += len(chunk)
+        n_changed += changed
+    os.replace(tmp_path, csv_path)
+    return n_changed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Label unclassified novels with the Text + Period model.')
+    parser.add_argument('--csv', default=CSV_PATH)
+    parser.add_argument('--snapshot', default=SNAPSHOT_PATH)
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--cache', default=CACHE_PATH)
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: every core)')
+    parser.add_argument('--update-csv', action='store_true', help='also write the predictions into the CSV')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        parser.error(f"{args.model} not found; train it first with python -m utils.training")
+    updates, n_candidates, n_scored = predict_csv(args.csv, args.model, args.cache, n_jobs=args.jobs)
+    n_labelled = int(updates['is_predicted'].sum())
+    print(f"{n_candidates} novels without a ground-truth label: {n_labelled} labelled "
+          f"({n_scored} scored, {n_labelled - n_scored} from cache), {n_candidates - n_labelled} too little text")
+    if args.update_csv:
+        changed = update_csv(updates, args.csv)
+        # The CSV changed, so the snapshot is rebuilt from it (with the predictions)
+        build_snapshot(args.csv, args.snapshot)
+        print(f"Updated {changed} rows in {args.csv} and rebuilt {args.snapshot}")
+    else:
+        changed = write_snapshot(updates, args.csv, args.snapshot)
+        print(f"Updated {changed} rows in {args.snapshot}")
@@ -0,0 +1,90 @@
+# This was written with the help of Claude AI, but substantial written text is mine.
+
+"""
+Model results shown on the Home, Methodology and Summary pages.
+
+The numbers come from the metrics artifact written by the training pipeline
+(`python -m utils.training`) and, when it has been run, the cross-validation
+results (`python -m utils.cross_validation`). Until that has been run, the results from the
+original write-up are used instead, so the pages always have something to show.
+"""
+
+import os
+import json
+
+METRICS_PATH = 'artifacts/model_metrics.json'
+CV_PATH = 'artifacts/cross_validation.json'
+
+# Bump when the layout of the metrics artifact changes
+ARTIFACT_VERSION = 1
+
+# Results from the original analysis (Speculative vs. Realistic, 80/20 split)
+PUBLISHED_METRICS = {
+    'artifact_version': ARTIFACT_VERSION,
+    'dataset_version': None,
+    'n_novels': 248,
+    'test_size': 0.2,
+    'train_share': {'realistic': 0.44, 'speculative': 0.56},
+    'models': {
+        'text_only': {'accuracy': 0.694},
+        'text_period': {
+            'accuracy': 0.758,
+            # Rows are the actual class, columns the predicted class
+            'labels': ['realistic', 'speculative'],
+            'confusion': [[13, 15], [0, 34]],
+        },
+    },
+    'mcnemar': {'statistic': 0.0, 'p_value': 0.5},
+    'alpha': 0.05,
+}
+
+
+def load_metrics(path=METRICS_PATH):
+    """
+    Reads the metrics artifact, falling back to the published results when it
+    is missing or was written with a different layout.
+    """
+    if os.path.exists(path):
+        with open(path) as f:
+            metrics = json.load(f)
+        if metrics.get('artifact_version') == ARTIFACT_VERSION:
+            return metrics
+    return PUBLISHED_METRICS
+
+
+def save_metrics(metrics, path=METRICS_PATH):
+    """
+    Writes the metrics artifact, stamped with the current layout version.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({**metrics, 'artifact_version': ARTIFACT_VERSION}, f, indent=2)
+
+
+def load_cross_validation(path=CV_PATH):
+    """
+    Cross-validation results (see utils/cross_validation.py), or None if
+    the runner hasn't been run.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def summarize(metrics):
+    """
+    Headline numbers for the pages: accuracies and their difference in
+    percentage points, and the McNemar result.
+    """
+    text_only = metrics['models']['text_only']['accuracy'] * 100
+    text_period = metrics['models']['text_period']['accuracy'] * 100
+    return {
+        'text_only': text_only,
+        'text_period': text_period,
+        'diff': text_period - text_only,
+        'statistic': metrics['mcnemar']['statistic'],
+        'p_value': metrics['mcnemar']['p_value'],
+        'alpha': metrics['alpha'],
+        'significant': metrics['mcnemar']['p_value'] < metrics['alpha'],
+    }
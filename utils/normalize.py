@@ -0,0 +1,104 @@
+# This was written with the help of Claude AI, but substantial written text is mine.
+
+"""
+Table-driven normalization of countries and literary periods.
+
+Both derivations are driven by the mapping tables below, so changing a
+boundary or adding an alias is a one-line edit:
+- Country aliases are resolved on the categories of the country column
+  (a few dozen strings), then every row is remapped with one integer take
+  on the category codes. No per-row string replacement.
+- Literary periods are binned from publication_year with np.searchsorted
+  against PERIOD_BOUNDARIES. The Methodology page's period table is built
+  from the same boundaries, so the two can't drift apart.
+
+`fingerprint` hashes the tables; the snapshot records it together with the
+dataset version, and derived columns are recomputed whenever it changes.
+"""
+
+import json
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# Alias -> the name it is consolidated into
+COUNTRY_ALIASES = {
+    'England': 'United Kingdom',
+    'United Kingdom of Great Britain and Ireland': 'United Kingdom',
+    'Kingdom of Great Britain': 'United Kingdom',
+    'Great Britain': 'United Kingdom',
+    'United States of America': 'United States',
+}
+
+# (period, first year); each period runs until the next one starts
+PERIOD_BOUNDARIES = [
+    ('classical', None),
+    ('romantic', 1800),
+    ('victorian', 1837),
+    ('modernist', 1901),
+    ('postwar', 1945),
+    ('contemporary', 1970),
+    ('modern', 2000),
+]
+
+# Period for novels without a publication year
+UNKNOWN_PERIOD = 'unknown'
+
+
+def period_order(boundaries=PERIOD_BOUNDARIES):
+    """
+    Chronological period names, with the unknown period last.
+    """
+    return [name for name, _ in boundaries] + [UNKNOWN_PERIOD]
+
+
+def period_table(boundaries=PERIOD_BOUNDARIES):
+    """
+    Period names and year ranges, as shown on the Methodology page.
+    """
+    years = []
+    for i, (_, start) in enumerate(boundaries):
+        end = boundaries[i + 1][1] if i + 1 < len(boundaries) else None
+        if start is None:
+            years.append(f"< {end}")
+        elif end is None:
+            years.append(f"{start}+")
+        else:
+            years.append(f"{start}-{end - 1}")
+    return pd.DataFrame({'Period': [name.title() for name, _ in boundaries], 'Years': years})
+
+
+def assign_periods(years, boundaries=PERIOD_BOUNDARIES):
+    """
+    Ordered categorical of literary periods for an array of publication years.
+    """
+    starts = np.array([start for _, start in boundaries[1:]], dtype=float)
+    if np.any(np.diff(starts) <= 0):
+        raise ValueError("PERIOD_BOUNDARIES must be in chronological order")
+    years = np.asarray(years, dtype=float)
+    codes = np.searchsorted(starts, years, side='right')
+    codes[np.isnan(years)] = len(boundaries)
+    return pd.Categorical.from_codes(codes, categories=period_order(boundaries), ordered=True)
+
+
+def consolidate_countries(values, aliases=COUNTRY_ALIASES):
+    """
+    Categorical of consolidated country names. Aliases are looked up once
+    per category, and rows are remapped by their codes.
+    """
+    cat = pd.Categorical(values)
+    resolved = [aliases.get(name, name) for name in cat.categories]
+    categories = sorted(set(resolved))
+    position = {name: i for i, name in enumerate(categories)}
+    # The extra last entry keeps missing values (code -1) missing
+    remap = np.array([position[name] for name in resolved] + [-1], dtype=np.int64)
+    return pd.Categorical.from_codes(remap[cat.codes], categories=pd.Index(categories, dtype=cat.categories.dtype))
+
+
+def fingerprint(aliases=COUNTRY_ALIASES, boundaries=PERIOD_BOUNDARIES):
+    """
+    Short hash of the mapping tables, to tell when derived columns are stale.
+    """
+    tables = json.dumps({'aliases': aliases, 'periods': boundaries}, sort_keys=True)
+    return hashlib.sha1(tables.encode('utf-8')).hexdigest()[:12]
@@ -0,0 +1,330 @@
+# This was written with the help of Claude AI, but substantial written text is mine.
+
+"""
+Precomputed content for the Home, Methodology and Summary pages.
+
+These pages only show fixed results: a few counts, the model metrics and a
+handful of charts. Each page's content (numbers, small tables and figure
+JSON) is produced by one function below, which the page renders. By
+default it is computed live from the shared dataset, with figures going
+through the figure cache.
+
+In static mode (NOVELS_STATIC_PAGES=1) the pages instead read the content
+from one JSON artifact written by the build command, so a rerun does no
+dataset loading, aggregation or figure building at all:
+    python -m utils.page_export
+    NOVELS_STATIC_PAGES=1 streamlit run Home_Page.py
+
+The artifact records the size and modification time of the files it was
+built from (the CSV, the snapshot, which can hold batch predictions, and
+the model artifacts). If any of them has changed since, the pages fall
+back to live computation until it is rebuilt, so a stale export is never
+shown. The Interactive Visualizations page always
+computes live.
+"""
+
+import os
+import json
+import argparse
+from datetime import datetime, timezone
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from utils.data import CSV_PATH, SNAPSHOT_PATH, dataset_version, read_dataset
+from utils.dataset import SharedDataset, get_dataset
+from utils.figure_cache import get_figure_cache
+from utils.metrics import CV_PATH, METRICS_PATH, load_cross_validation, load_metrics, summarize
+from utils.normalize import period_table
+from utils.profiling import span
+
+EXPORT_PATH = 'artifacts/page_export.json'
+STATIC_ENV = 'NOVELS_STATIC_PAGES'
+
+ENABLED = os.environ.get(STATIC_ENV, '') not in ('', '0')
+
+# Bump when the layout of the export changes
+EXPORT_VERSION = 1
+
+# Files the content is computed from; the export is stale once any of them changes
+SOURCES = [CSV_PATH, SNAPSHOT_PATH, METRICS_PATH, CV_PATH]
+
+COLORS = {'speculative': '#e74c3c', 'realistic': '#3498db', 'other': '#95a5a6'}
+
+
+def _figure(figures, version, chart_id, state, build):
+    """
+    A chart as a plain dict, through the figure cache when there is one.
+    """
+    if figures is None:
+        return json.loads(build().to_json())
+    return json.loads(figures.figure_json(version, chart_id, state, build))
+
+
+def _table(frame):
+    """
+    A small DataFrame in a JSON-friendly form (rebuilt with pd.DataFrame(**table)).
+    """
+    split = frame.to_dict(orient='split')
+    return {'data': split['data'], 'index': split['index'], 'columns': split['columns']}
+
+
+def home_content(dataset, metrics, figures=None):
+    """
+    Counts, headline results and charts for the Home page.
+    """
+    cube = dataset.cube
+    type_counts = cube.value_counts('fiction_type')
+
+    def build_timeline():
+        decade_counts = cube.crosstab('decade', 'fiction_type')
+
+        fig = go.Figure()
+        for ftype in ['realistic', 'speculative', 'other']:
+            if ftype in decade_counts.columns:
+                fig.add_trace(go.Scatter(
+                    x=decade_counts.index, y=decade_counts[ftype],
+                    name=ftype.title(), mode='lines+markers',
+                    fill='tonexty' if ftype != 'realistic' else 'tozeroy',
+                    line=dict(color=COLORS[ftype], width=2), stackgroup='one'
+                ))
+
+        fig.update_layout(
+            title='Novels Published by Decade',
+            xaxis_title='Decade',
+            yaxis_title='Number of Novels',
+            hovermode='x unified',
+            height=500
+        )
+        return fig
+
+    def build_period_chart():
+        period_pct = cube.crosstab('literary_period', 'fiction_type', normalize='index') * 100
+
+        fig = go.Figure()
+        for ftype in ['realistic', 'speculative', 'other']:
+            if ftype in period_pct.columns:
+                fig.add_trace(go.Bar(
+                    name=ftype.title(), x=period_pct.index, y=period_pct[ftype],
+                    marker_color=COLORS[ftype],
+                    text=period_pct[ftype].round(1),
+                    texttemplate='%{text}%',
+                    textposition='inside'
+                ))
+
+        fig.update_layout(
+            title='Fiction Type Distribution by Literary Period (%)',
+            xaxis_title='Literary Period',
+            yaxis_title='Percentage',
+            barmode='stack',
+            height=500
+        )
+        return fig
+
+    return {
+        'counts': {
+            'total': cube.total(),
+            'speculative': int(type_counts.get('speculative', 0)),
+            'realistic': int(type_counts.get('realistic', 0)),
+            'other': int(type_counts.get('other', 0)),
+            'unclassified': cube.total(where={'fiction_type': [None]}),
+        },
+        'results': summarize(metrics),
+        'figures': {
+            'home_timeline': _figure(figures, dataset.version, 'home_timeline', {}, build_timeline),
+            'home_period': _figure(figures, dataset.version, 'home_period', {}, build_period_chart),
+        },
+    }
+
+
+def methodology_content(dataset, metrics, cv=None, figures=None):
+    """
+    Collection counts, model results, tables and charts for the Methodology page.
+    """
+    df = dataset.frame
+    results = summarize(metrics)
+    model2 = metrics['models']['text_period']
+    significance = metrics.get('significance')
+
+    def build_fiction_chart():
+        fiction_dist = dataset.cube.value_counts('fiction_type')
+        return px.bar(x=fiction_dist.index, y=fiction_dist.values, color=fiction_dist.index,
+                      color_discrete_map=COLORS, title='Fiction Type Distribution')
+
+    def build_accuracy_chart():
+        accuracy = pd.DataFrame({'Model': ['Text Only', 'Text + Period'],
+                                 'Accuracy': [round(results['text_only'], 1), round(results['text_period'], 1)]})
+
+        fig = go.Figure(data=[
+            go.Bar(x=accuracy['Model'], y=accuracy['Accuracy'], marker_color=['#3498db', '#2ecc71'],
+                   text=accuracy['Accuracy'].apply(lambda x: f'{x}%'), textposition='outside')
+        ])
+        fig.add_hline(y=50, line_dash="dash", line_color="red", annotation_text="Baseline")
+        fig.update_layout(title='Model Performance', yaxis_range=[0, 100], height=400)
+        return fig
+
+    def build_confusion_chart():
+        confusion = pd.DataFrame(model2['confusion'])
+        confusion_pct = confusion.div(confusion.sum(axis=1), axis=0) * 100
+
+        fig = px.imshow(confusion_pct.values, x=['Realistic', 'Speculative'], y=['Realistic', 'Speculative'],
+                        color_continuous_scale='Blues', text_auto='.1f',
+                        labels=dict(color="Percentage (%)"), title='Confusion Matrix (% of actual class)')
+        fig.update_layout(height=400)
+        return fig
+
+    def build_ci_chart():
+        boot = significance['bootstrap']
+        observed = significance['observed_diff'] * 100
+        fig = go.Figure(go.Scatter(
+            x=[observed], y=['Text + Period − Text Only'], mode='markers', marker=dict(size=12, color='#2ecc71'),
+            error_x=dict(type='data', symmetric=False,
+                         array=[boot['ci_high'] * 100 - observed], arrayminus=[observed - boot['ci_low'] * 100])
+        ))
+        fig.add_vline(x=0, line_dash="dash", line_color="red", annotation_text="No difference")
+        fig.update_layout(title=f"Accuracy Difference ({boot['confidence']:.0%} bootstrap CI)",
+                          xaxis_title='Percentage points', height=250)
+        return fig
+
+    cv_folds = None
+    if cv:
+        cv_folds = _table(pd.DataFrame([{
+            'Fold': f['fold'] + 1,
+            'Text Only (%)': round(f['text_only']['accuracy'] * 100, 1),
+            'Text + Period (%)': round(f['text_period']['accuracy'] * 100, 1),
+            'Realistic Recall (%)': round(f['text_period']['recall']['realistic'] * 100, 1),
+            'Speculative Recall (%)': round(f['text_period']['recall']['speculative'] * 100, 1),
+        } for f in cv['folds']]).set_index('Fold'))
+
+    figures_out = {
+        'method1': _figure(figures, dataset.version, 'method1', {}, build_fiction_chart),
+        'method2': _figure(figures, dataset.version, 'method2',
+                           {'accuracy': (results['text_only'], results['text_period'])}, build_accuracy_chart),
+        'method3': _figure(figures, dataset.version, 'method3', {'confusion': model2['confusion']},
+                           build_confusion_chart),
+    }
+    if significance:
+        figures_out['method4'] = _figure(figures, dataset.version, 'method4', significance, build_ci_chart)
+
+    return {
+        'collection': {
+            'total': len(df),
+            'with_genres': int(df['genre'].notna().sum()),
+            'with_descriptions': int(dataset.text.count_present('description')),
+            'countries': int(df['country_grouped'].nunique()),
+        },
+        'results': results,
+        # Everything the page shows from the metrics artifact except the raw test predictions
+        'metrics': {key: value for key, value in metrics.items() if key != 'predictions'},
+        'cv': cv and {'n_splits': cv['n_splits'], 'summary': cv['summary'], 'folds': cv_folds},
+        'period_table': _table(period_table()),
+        'figures': figures_out,
+    }
+
+
+def summary_content(metrics):
+    """
+    Headline results, training class shares and per-class recall for the Summary page.
+    """
+    model2 = metrics['models']['text_period']
+    confusion = pd.DataFrame(model2['confusion'], index=model2['labels'], columns=model2['labels'])
+    recall = {label: float(confusion.loc[label, label] / confusion.loc[label].sum() * 100)
+              for label in confusion.index}
+    return {'results': summarize(metrics), 'train_share': metrics['train_share'], 'recall': recall}
+
+
+def _live_content(page, dataset=None, figures=None):
+    if page == 'summary':
+        return summary_content(load_metrics())
+    if page == 'home':
+        return home_content(dataset, load_metrics(), figures)
+    return methodology_content(dataset, load_metrics(), load_cross_validation(), figures)
+
+
+def _source_stamps(paths=SOURCES):
+    """
+    (size, mtime) of each source file, or None when it doesn't exist.
+    """
+    stamps = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            stamps[path] = [stat.st_size, stat.st_mtime_ns]
+        except FileNotFoundError:
+            stamps[path] = None
+    return stamps
+
+
+def build_export(path=EXPORT_PATH, csv_path=CSV_PATH):
+    """
+    Computes every page's content from the current data and model artifacts
+    and writes it to `path`. Returns the export.
+    """
+    # Stamped first, so a file that changes during the build makes the export stale
+    sources = _source_stamps()
+    version = dataset_version(csv_path)
+    frame, predictions = read_dataset(csv_path, version=version)
+    dataset = SharedDataset(frame, version, csv_path, predictions)
+    export = {
+        'export_version': EXPORT_VERSION,
+        'dataset_version': dataset.version,
+        'built_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'sources': sources,
+        'pages': {page: _live_content(page, dataset) for page in ['home', 'methodology', 'summary']},
+    }
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(export, f)
+    os.replace(tmp_path, path)
+    return export
+
+
+@st.cache_resource(show_spinner=False)
+def _read_export(path, mtime_ns):
+    # Keyed by mtime, so a rebuilt export is read again
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_export(path=EXPORT_PATH):
+    """
+    The export, or None if it is missing, has an old layout, or any of its
+    source files changed since it was built (a few stat calls).
+    """
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    export = _read_export(path, mtime_ns)
+    if export.get('export_version') != EXPORT_VERSION or export.get('sources') != _source_stamps():
+        return None
+    return export
+
+
+def page_content(page):
+    """
+    Content for 'home', 'methodology' or 'summary': from the export in
+    static mode (when it is current), otherwise computed live.
+    """
+    if ENABLED:
+        export = load_export()
+        if export is not None:
+            return export['pages'][page]
+    with span(f'content:{page}'):
+        if page == 'summary':
+            return _live_content(page)
+        return _live_content(page, get_dataset(), get_figure_cache())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Precompute the Home, Methodology and Summary pages.')
+    parser.add_argument('--csv', default=CSV_PATH)
+    parser.add_argument('--out', default=EXPORT_PATH)
+    args = parser.parse_args()
+
+    export = build_export(args.out, args.csv)
+    print(f"Wrote content for {', '.join(export['pages'])} (dataset {export['dataset_version']}) "
+          f"to {args.out} ({os.path.getsize(args.out) / 1024:.0f} KB)")
@@ -0,0 +1,146 @@
+# This was written with the help of Claude AI, but substantial written text is mine.
+
+"""
+Lightweight timing and memory instrumentation for the pages.
+
+Turn it on by setting NOVELS_PROFILE=1 before starting the app:
+    NOVELS_PROFILE=1 streamlit run Home_Page.py
+
+Each page calls `start_run` at the top and `end_run` at the bottom, and
+marks its sections with `stage("load")`, `stage("plot:timeline")`, ...
+(each stage lasts until the next one starts). Helpers wrap finer steps in
+`with span("figure:build")`. When profiling is on, `end_run` shows the
+rerun's breakdown in the sidebar and appends it as one JSON line to
+PROFILE_LOG. When it is off, every call returns straight away.
+"""
+
+import os
+import json
+import time
+import threading
+import contextlib
+
+import pandas as pd
+import streamlit as st
+
+PROFILE_ENV = 'NOVELS_PROFILE'
+PROFILE_LOG = 'artifacts/profile.jsonl'
+
+ENABLED = os.environ.get(PROFILE_ENV, '') not in ('', '0')
+
+# Each session's script runs in its own thread, so each rerun's spans are thread-local
+_local = threading.local()
+_log_lock = threading.Lock()
+_NULL_SPAN = contextlib.nullcontext()
+
+
+def current_rss_mb():
+    """
+    Resident memory of this process right now (Linux), else the peak so far.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Run:
+    """
+    The spans recorded during one rerun of one page.
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.spans = []
+        self.depth = 0
+        self.stage = None
+        self.start = time.perf_counter()
+        self.rss_start = current_rss_mb()
+
+    def open(self, name):
+        record = {'name': name, 'depth': self.depth, 'start': time.perf_counter(), 'rss': current_rss_mb()}
+        self.spans.append(record)
+        self.depth += 1
+        return record
+
+    def close(self, record):
+        self.depth -= 1
+        record['ms'] = (time.perf_counter() - record.pop('start')) * 1000
+        record['rss_delta_mb'] = current_rss_mb() - record.pop('rss')
+
+
+class _Span:
+    __slots__ = ('run', 'name', 'record')
+
+    def __init__(self, run, name):
+        self.run = run
+        self.name = name
+
+    def __enter__(self):
+        self.record = self.run.open(self.name)
+
+    def __exit__(self, *exc):
+        self.run.close(self.record)
+
+
+def _run():
+    return getattr(_local, 'run', None)
+
+
+def span(name):
+    """
+    Context manager timing a block inside the current rerun.
+    """
+    run = _run() if ENABLED else None
+    if run is None:
+        return _NULL_SPAN
+    return _Span(run, name)
+
+
+def stage(name):
+    """
+    Ends the current stage of the page, if any, and starts the next one.
+    """
+    run = _run() if ENABLED else None
+    if run is None:
+        return
+    if run.stage is not None:
+        run.close(run.stage)
+    run.stage = run.open(name)
+
+
+def start_run(page):
+    if ENABLED:
+        _local.run = Run(page)
+
+
+def end_run(log_path=PROFILE_LOG):
+    """
+    Closes the rerun, shows its breakdown in the sidebar and logs it.
+    """
+    run = _run() if ENABLED else None
+    if run is None:
+        return
+    if run.stage is not None:
+        run.close(run.stage)
+    _local.run = None
+
+    total_ms = (time.perf_counter() - run.start) * 1000
+    rss = current_rss_mb()
+    entry = {'time': time.time(), 'page': run.page, 'total_ms': total_ms, 'rss_mb': rss,
+             'rss_delta_mb': rss - run.rss_start, 'spans': run.spans}
+    os.makedirs(os.path.dirname(log_path) or '.', exist_ok=True)
+    with _log_lock, open(log_path, 'a') as f:
+        f.write(json.dumps(entry) + '\n')
+
+    with st.sidebar:
+        st.subheader("Timing")
+        st.caption(f"Rerun took {total_ms:.0f} ms; process memory {rss:.0f} MB "
+                   f"({rss - run.rss_start:+.1f} MB this rerun)")
+        st.dataframe(pd.DataFrame({
+            'span': [' ' * s['depth'] + s['name'] for s in run.spans],
+            'ms': [round(s['ms'], 1) for s in run.spans],
+            'MB': [round(s['rss_delta_mb'], 1) for s in run.spans],
+        }), hide_index=True, use_container_width=True)
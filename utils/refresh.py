@@ -0,0 +1,115 @@
+# This was written with the help of Claude AI, but substantial written text is mine.
+
+"""
+Watches the dataset CSV so new rows are picked up without a server restart.
+
+`CsvWatcher` remembers how much of the file it has read, plus a running
+SHA-1 of those bytes (so its version always equals `dataset_version` of
+what it has read). Checking for changes is a single `os.stat`. When the file
+has only grown, and the bytes just before the old end are unchanged, only
+the appended rows are parsed and derived (their text columns are parsed
+separately, for the text store); any other change (the file was
+rewritten, truncated or edited in place) is reported as a full replace.
+
+A half-written last line is left for the next poll, so rows are only read
+once they are complete.
+"""
+
+import io
+import os
+import hashlib
+from collections import namedtuple
+
+import pandas as pd
+
+from utils.data import CSV_PATH, read_csv_dataset
+from utils.text_store import TEXT_COLUMNS
+
+# kind is 'append' (rows holds just the new, derived rows, text their text
+# columns) or 'replace'
+Change = namedtuple('Change', ['kind', 'rows', 'text', 'version'])
+
+# Bytes before the old end of file that must be unchanged for a change to count as an append
+TAIL_BYTES = 64 * 1024
+
+
+class CsvWatcher:
+    """
+    Tracks one CSV file and reports appended rows or a full replacement.
+    """
+
+    def __init__(self, csv_path=CSV_PATH):
+        self.csv_path = csv_path
+        self._read_all()
+
+    def _read_all(self):
+        digest = hashlib.sha1()
+        with open(self.csv_path, 'rb') as f:
+            self.header = f.readline()
+            f.seek(0)
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+            self.size = f.tell()
+            f.seek(max(0, self.size - TAIL_BYTES))
+            self._tail = f.read()
+        self._digest = digest
+        self._stat = self._current_stat()
+
+    def _current_stat(self):
+        stat = os.stat(self.csv_path)
+        return stat.st_size, stat.st_mtime_ns
+
+    @property
+    def version(self):
+        return self._digest.hexdigest()[:12]
+
+    def changed(self):
+        """
+        Cheap check (one stat call) for whether the file may have changed.
+        """
+        try:
+            return self._current_stat() != self._stat
+        except FileNotFoundError:
+            return False
+
+    def poll(self):
+        """
+        A Change describing what happened to the file since the last poll,
+        or None when there is nothing (complete) to pick up.
+        """
+        if not self.changed():
+            return None
+        stat = self._current_stat()
+        size = stat[0]
+        if size <= self.size or not self._tail.endswith(b'\n'):
+            return self._replace()
+
+        with open(self.csv_path, 'rb') as f:
+            if f.readline() != self.header:
+                return self._replace()
+            f.seek(self.size - len(self._tail))
+            if f.read(len(self._tail)) != self._tail:
+                return self._replace()
+            appended = f.read(size - self.size)
+
+        # Only whole lines. A partial last row is read again, from the end of
+        # the last complete line, once the file changes again.
+        self._stat = stat
+        complete = appended[:appended.rfind(b'\n') + 1]
+        if not complete:
+            return None
+        self._digest.update(complete)
+        self.size += len(complete)
+        self._tail = (self._tail + complete)[-TAIL_BYTES:]
+
+        rows = read_csv_dataset(io.BytesIO(self.header + complete))
+        text = pd.read_csv(io.BytesIO(self.header + complete), usecols=['qid'] + TEXT_COLUMNS)
+        return Change('append', rows, text, self.version)
+
+    def _replace(self):
+        old_version = self.version
+        self._read_all()
+        if self.version == old_version:
+            # Touched, but the content is the same
+            return None
+        return Change('replace', None, None, self.version)
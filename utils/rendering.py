@@ -0,0 +1,54 @@
+# This was written with the help of Claude AI, but substantial written text is mine.
+
+"""
+Large-dataset rendering mode for the point charts.
+
+Above LARGE_DATASET_ROWS rows, sending every row to the browser as an SVG
+marker makes the payload huge and the page slow. In that case the charts
+switch to WebGL traces and plot a density-preserving sample: the x range is
+cut into bins, and every (x bin, category) cell keeps a share of points
+proportional to its size, with at least one point so sparse regions stay
+visible. Hover details are only sent for the sampled points.
+(Histograms are already binned on the server, see utils/year_index.py.)
+"""
+
+import numpy as np
+import pandas as pd
+
+LARGE_DATASET_ROWS = 20_000
+MAX_SCATTER_POINTS = 5_000
+
+
+def is_large(n_rows, threshold=LARGE_DATASET_ROWS):
+    return n_rows > threshold
+
+
+def density_sample(x, category, max_points=MAX_SCATTER_POINTS, bins=100, seed=0):
+    """
+    Positions of a sample of at most about `max_points` rows that keeps the
+    shape of the (x, category) distribution.
+    """
+    x = np.asarray(x, dtype=float)
+    n = len(x)
+    if n <= max_points:
+        return np.arange(n)
+
+    finite = np.isfinite(x)
+    lo, hi = (x[finite].min(), x[finite].max()) if finite.any() else (0.0, 1.0)
+    x_bin = np.full(n, bins, dtype=np.int64)
+    x_bin[finite] = np.minimum(((x[finite] - lo) / max(hi - lo, 1e-9) * bins).astype(np.int64), bins - 1)
+    category_codes, _ = pd.factorize(pd.Series(category), use_na_sentinel=False)
+    cell = x_bin * (category_codes.max() + 1) + category_codes
+
+    # Random order, then grouped by cell: each row's rank within its cell
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(n)
+    order = order[np.argsort(cell[order], kind='stable')]
+    sorted_cells = cell[order]
+    starts = np.flatnonzero(np.r_[True, sorted_cells[1:] != sorted_cells[:-1]])
+    sizes = np.diff(np.r_[starts, n])
+    rank = np.arange(n) - np.repeat(starts, sizes)
+
+    quota = np.maximum(1, np.round(sizes * max_points / n)).astype(np.int64)
+    keep = rank < np.repeat(quota, sizes)
+    return np.sort(order[keep])
@@ -0,0 +1,156 @@
+# This was written with the help of Claude AI, but substantial written text is mine.
+
+"""
+Inverted-index full-text search for the Novel Explorer.
+
+Tokens from label, author, description and text_filtered are indexed once
+per dataset version and saved to disk. The postings are stored CSR-style:
+a sorted vocabulary, an offsets array, and flat arrays of document ids and
+weights. A query looks each token up with a binary search (the last token
+also matches as a prefix, so results update while typing), keeps the
+documents that match every token, and ranks them by tf-idf with title and
+author matches weighted higher.
+"""
+
+import os
+import re
+from collections import defaultdict
+
+import numpy as np
+
+SEARCH_INDEX_PATH = 'data/search_index.npz'
+
+# How much a token counts depending on where it appears
+FIELD_WEIGHTS = {'label': 3.0, 'author': 2.0, 'description': 1.0, 'text_filtered': 1.0}
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+def parse_query(query):
+    """
+    The query's tokens, and whether the last one also matches as a prefix
+    (it does unless the query ends with a space). Two queries with the same
+    parse select the same rows.
+    """
+    return tuple(tokenize(query)), not query.endswith(' ')
+
+
+def build_search_index(frame, text_store, version, path=SEARCH_INDEX_PATH, chunksize=10_000):
+    """
+    Indexes every row of `frame` (document id = row position) and saves the
+    index. Text columns that aren't in the frame are read from the text store.
+    """
+    postings = defaultdict(dict)
+    qids = frame['qid'].to_numpy(dtype=str)
+    text_fields = [f for f in FIELD_WEIGHTS if f not in frame.columns]
+
+    for start in range(0, len(frame), chunksize):
+        chunk = frame.iloc[start:start + chunksize]
+        texts = text_store.get_many(list(qids[start:start + chunksize]), text_fields)
+        fields = {f: chunk[f].to_numpy() for f in FIELD_WEIGHTS if f in frame.columns}
+        fields.update({f: texts[f].to_numpy() for f in text_fields})
+        for offset in range(len(chunk)):
+            doc = start + offset
+            for field, weight in FIELD_WEIGHTS.items():
+                value = fields[field][offset]
+                for token in tokenize(value if isinstance(value, str) else None):
+                    postings[token][doc] = postings[token].get(doc, 0.0) + weight
+
+    vocab = np.array(sorted(postings), dtype=str)
+    offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(postings[t]) for t in vocab])
+    docs = np.empty(offsets[-1], dtype=np.int32)
+    weights = np.empty(offsets[-1], dtype=np.float32)
+    for i, token in enumerate(vocab):
+        entries = postings[token]
+        docs[offsets[i]:offsets[i + 1]] = list(entries.keys())
+        # Dampened term frequency, so long texts don't drown out titles
+        weights[offsets[i]:offsets[i + 1]] = np.log1p(list(entries.values()))
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    np.savez(path, version=np.array(version), qids=qids, vocab=vocab, offsets=offsets,
+             docs=docs, weights=weights)
+    return SearchIndex(path)
+
+
+def open_search_index(frame, text_store, version, path=SEARCH_INDEX_PATH):
+    """
+    Loads the saved index, rebuilding it when it is missing or was built
+    from a different dataset version.
+    """
+    if os.path.exists(path):
+        index = SearchIndex(path)
+        if index.version == version and len(index.qids) == len(frame):
+            return index
+    return build_search_index(frame, text_store, version, path)
+
+
+class SearchIndex:
+    """
+    Read-only inverted index loaded from disk.
+    """
+
+    def __init__(self, path=SEARCH_INDEX_PATH):
+        with np.load(path) as data:
+            self.version = str(data['version'])
+            self.qids = data['qids']
+            self.vocab = data['vocab']
+            self.offsets = data['offsets']
+            self.docs = data['docs']
+            self.weights = data['weights']
+        n_docs = max(len(self.qids), 1)
+        doc_freq = np.diff(self.offsets)
+        self.idf = np.log((n_docs + 1) / (doc_freq + 1)) + 1
+
+    def nbytes(self):
+        """
+        Memory held by the loaded index arrays.
+        """
+        arrays = [self.qids, self.vocab, self.offsets, self.docs, self.weights, self.idf]
+        return sum(a.nbytes for a in arrays)
+
+    def _terms(self, token, prefix):
+        """
+        Vocabulary positions matching a token (or every token it starts).
+        """
+        lo = np.searchsorted(self.vocab, token, side='left')
+        if prefix:
+            # Every word starting with `token` sorts before token + a max code point
+            hi = np.searchsorted(self.vocab, token + '\U0010ffff', side='left')
+        else:
+            hi = lo + 1 if lo < len(self.vocab) and self.vocab[lo] == token else lo
+        return range(lo, hi)
+
+    def search(self, query, limit=None):
+        """
+        Document ids (row positions) matching every token of `query`, best
+        first. The last token also matches as a prefix unless the query ends
+        with a space.
+        """
+        tokens, prefix_last = parse_query(query)
+        if not tokens:
+            return np.empty(0, dtype=np.int64)
+
+        scores = np.zeros(len(self.qids), dtype=np.float64)
+        matched = np.zeros(len(self.qids), dtype=np.int32)
+        for i, token in enumerate(tokens):
+            hit = np.zeros(len(self.qids), dtype=bool)
+            for term in self._terms(token, prefix_last and i == len(tokens) - 1):
+                start, stop = self.offsets[term], self.offsets[term + 1]
+                docs = self.docs[start:stop]
+                scores[docs] += self.weights[start:stop] * self.idf[term]
+                hit[docs] = True
+            matched += hit
+
+        found = np.flatnonzero(matched == len(tokens))
+        ranked = found[np.argsort(-scores[found], kind='stable')]
+        return ranked if limit is None else ranked[:limit]
+
+    def search_qids(self, query, limit=None):
+        return self.qids[self.search(query, limit)]
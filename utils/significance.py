@@ -0,0 +1,145 @@
+# This was written with the help of Claude AI, but substantial written text is mine.
+
+"""
+Significance tests for comparing the two models on paired predictions.
+
+Alongside McNemar's test, the difference in accuracy is bootstrapped (for a
+confidence interval) and permutation-tested (for a p-value). Resamples are
+drawn in batches as NumPy index/sign matrices, one row per resample, and the
+batches are spread across worker processes.
+
+Recompute the tests for the current metrics artifact with:
+    python -m utils.significance
+"""
+
+import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.stats import binomtest
+
+from utils.metrics import METRICS_PATH, load_metrics, save_metrics
+
+# Upper bound on the cells in one resample matrix, to keep worker memory flat
+MAX_CHUNK_CELLS = 10_000_000
+
+
+def mcnemar(y_true, pred_a, pred_b):
+    """
+    Exact McNemar test on the discordant pairs of two paired predictions.
+    """
+    correct_a = np.asarray(pred_a) == np.asarray(y_true)
+    correct_b = np.asarray(pred_b) == np.asarray(y_true)
+    only_a = int(np.sum(correct_a & ~correct_b))
+    only_b = int(np.sum(~correct_a & correct_b))
+    if only_a + only_b == 0:
+        return {'statistic': 0.0, 'p_value': 1.0, 'only_a': 0, 'only_b': 0}
+    p_value = binomtest(min(only_a, only_b), only_a + only_b, 0.5).pvalue
+    return {'statistic': float(min(only_a, only_b)), 'p_value': float(p_value),
+            'only_a': only_a, 'only_b': only_b}
+
+
+def _bootstrap_chunk(args):
+    """
+    Accuracy differences for one batch of bootstrap resamples. `diff` is
+    +1/-1/0 per test example (only b right / only a right / tie).
+    """
+    diff, size, seed = args
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, len(diff), size=(size, len(diff)), dtype=np.int32)
+    return diff[idx].sum(axis=1, dtype=np.int64) / len(diff)
+
+
+def _permutation_chunk(args):
+    """
+    Accuracy differences for one batch of random within-pair swaps.
+    """
+    diff, size, seed = args
+    rng = np.random.default_rng(seed)
+    signs = rng.choice(np.array([-1, 1], dtype=np.int8), size=(size, len(diff)))
+    return (signs * diff).sum(axis=1, dtype=np.int64) / len(diff)
+
+
+def _run_chunks(worker, make_args, n, chunk_size, seed, n_jobs):
+    """
+    Splits n resamples into chunks with independent seeds and runs them,
+    in a process pool unless n_jobs is 1.
+    """
+    sizes = [min(chunk_size, n - start) for start in range(0, n, chunk_size)]
+    if not sizes:
+        return np.empty(0)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [make_args(size, s) for size, s in zip(sizes, seeds)]
+    if n_jobs == 1 or len(tasks) == 1:
+        return np.concatenate([worker(task) for task in tasks])
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        return np.concatenate(list(pool.map(worker, tasks)))
+
+
+def bootstrap_diff(correct_a, correct_b, n_resamples=10_000, chunk_size=1_000, seed=42, n_jobs=None):
+    """
+    Bootstrap distribution of accuracy(b) - accuracy(a), resampling the
+    paired test examples with replacement.
+    """
+    diff = np.asarray(correct_b, dtype=np.int8) - np.asarray(correct_a, dtype=np.int8)
+    chunk_size = max(1, min(chunk_size, MAX_CHUNK_CELLS // max(1, len(diff))))
+    return _run_chunks(_bootstrap_chunk, lambda size, s: (diff, size, s),
+                       n_resamples, chunk_size, seed, n_jobs)
+
+
+def permutation_diff(correct_a, correct_b, n_permutations=10_000, chunk_size=1_000, seed=42, n_jobs=None):
+    """
+    Null distribution of the accuracy difference when each pair's two
+    predictions are randomly swapped.
+    """
+    diff = np.asarray(correct_b, dtype=np.int8) - np.asarray(correct_a, dtype=np.int8)
+    chunk_size = max(1, min(chunk_size, MAX_CHUNK_CELLS // max(1, len(diff))))
+    return _run_chunks(_permutation_chunk, lambda size, s: (diff, size, s),
+                       n_permutations, chunk_size, seed, n_jobs)
+
+
+def compare_models(y_true, pred_a, pred_b, n_resamples=10_000, confidence=0.95, seed=42, n_jobs=None):
+    """
+    McNemar, bootstrap confidence interval and permutation test for the
+    difference in accuracy between model a and model b.
+    """
+    y_true = np.asarray(y_true)
+    correct_a = np.asarray(pred_a) == y_true
+    correct_b = np.asarray(pred_b) == y_true
+    observed = float(correct_b.mean() - correct_a.mean())
+
+    boot = bootstrap_diff(correct_a, correct_b, n_resamples, seed=seed, n_jobs=n_jobs)
+    tail = (1 - confidence) / 2
+    low, high = np.quantile(boot, [tail, 1 - tail])
+
+    null = permutation_diff(correct_a, correct_b, n_resamples, seed=seed + 1, n_jobs=n_jobs)
+    # Two-sided, counting the observed arrangement as one of the permutations
+    p_value = (np.sum(np.abs(null) >= abs(observed) - 1e-12) + 1) / (len(null) + 1)
+
+    return {
+        'observed_diff': observed,
+        'mcnemar': mcnemar(y_true, pred_a, pred_b),
+        'bootstrap': {'n_resamples': len(boot), 'confidence': confidence,
+                      'ci_low': float(low), 'ci_high': float(high), 'std': float(boot.std())},
+        'permutation': {'n_permutations': len(null), 'p_value': float(p_value)},
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Recompute significance tests for the metrics artifact.')
+    parser.add_argument('--metrics', default=METRICS_PATH)
+    parser.add_argument('--resamples', type=int, default=10_000)
+    parser.add_argument('--jobs', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    metrics = load_metrics(args.metrics)
+    if 'predictions' not in metrics:
+        raise SystemExit(f"No paired predictions in {args.metrics}; run python -m utils.training first.")
+    predictions = metrics['predictions']
+    metrics['significance'] = compare_models(predictions['y_true'], predictions['text_only'],
+                                             predictions['text_period'], args.resamples, n_jobs=args.jobs)
+    save_metrics(metrics, args.metrics)
+    bootstrap = metrics['significance']['bootstrap']
+    print(f"95% CI [{bootstrap['ci_low']:+.3f}, {bootstrap['ci_high']:+.3f}]  "
+          f"permutation p = {metrics['significance']['permutation']['p_value']:.4f}")
@@ -0,0 +1,221 @@
+# This was written with the help of Claude AI, but substantial written text is mine.
+
+"""
+Side store for the large free-text columns, keyed by qid.
+
+No chart reads first lines, epigraphs or the model text, so they are kept out
+of the in-memory frame. The store is a directory holding:
+    blob.bin      all field values as concatenated UTF-8 bytes
+    offsets.npy   start of every (row, column) field in the blob, plus the end
+    present.npy   False where the CSV value was missing
+    qids.npy      qids sorted, and rows.npy the store row for each of them
+    meta.json     column names, row count and dataset version
+Everything except meta.json is memory-mapped, so opening the store is cheap
+and only the fields that are actually looked up are read from disk.
+
+Rows appended to the CSV are added with `append_text_store`, which writes
+only their text to the end of the blob (the index arrays are rewritten,
+but they hold a few numbers per row).
+"""
+
+import os
+import json
+
+import numpy as np
+import pandas as pd
+
+TEXT_STORE_PATH = 'data/text_store'
+
+# Free-text columns that live in the store instead of the hot frame
+TEXT_COLUMNS = ['description', 'first_line', 'last_line', 'epigraph', 'text', 'text_filtered']
+
+
+def build_text_store(csv_path, path=TEXT_STORE_PATH, version=None, chunksize=50_000):
+    """
+    Streams the text columns out of the CSV in chunks and writes the store.
+    """
+    os.makedirs(path, exist_ok=True)
+    # Everything is written under a temporary name and then swapped in, so
+    # stores that are already open (memory-mapped) keep reading the old files
+    staged = []
+
+    def staged_path(name):
+        staged.append(name)
+        return os.path.join(path, name + '.tmp')
+
+    qids = []
+    offsets = [np.zeros(1, dtype=np.int64)]
+    present = []
+    position = 0
+
+    with open(staged_path('blob.bin'), 'wb') as blob:
+        for chunk in pd.read_csv(csv_path, usecols=['qid'] + TEXT_COLUMNS, chunksize=chunksize):
+            position = _write_rows(blob, chunk, position, offsets, present)
+            qids.extend(chunk['qid'].astype(str))
+
+    qids = np.array(qids, dtype=str)
+    order = np.argsort(qids, kind='stable')
+    _write_index(staged_path, np.concatenate(offsets),
+                 np.concatenate(present) if present else np.zeros((0, len(TEXT_COLUMNS)), dtype=bool),
+                 qids[order], order, version)
+    _swap_in(path, staged)
+
+
+def _write_rows(blob, chunk, position, offsets, present):
+    """
+    Writes one chunk's text fields to the blob and records their end
+    offsets and presence. Returns the new end of the blob.
+    """
+    values = chunk[TEXT_COLUMNS]
+    present.append(values.notna().to_numpy())
+    encoded = [str(v).encode('utf-8') for v in values.fillna('').to_numpy().ravel()]
+    blob.write(b''.join(encoded))
+
+    lengths = np.fromiter((len(e) for e in encoded), dtype=np.int64, count=len(encoded))
+    offsets.append(position + np.cumsum(lengths))
+    return position + int(lengths.sum())
+
+
+def _write_index(staged_path, offsets, present, qids, rows, version):
+    arrays = {'offsets.npy': offsets, 'present.npy': present, 'qids.npy': qids, 'rows.npy': rows}
+    for name, array in arrays.items():
+        with open(staged_path(name), 'wb') as f:
+            np.save(f, array)
+    with open(staged_path('meta.json'), 'w') as f:
+        json.dump({'columns': TEXT_COLUMNS, 'rows': len(qids), 'version': version}, f)
+
+
+def _swap_in(path, staged):
+    # meta.json goes last, so the store only looks current once every file is in place
+    for name in staged:
+        os.replace(os.path.join(path, name + '.tmp'), os.path.join(path, name))
+
+
+def append_text_store(rows, from_version, version, path=TEXT_STORE_PATH):
+    """
+    Adds the text columns of appended CSV rows (`rows`, a DataFrame with qid
+    and TEXT_COLUMNS) to a store built for `from_version`, which then
+    belongs to `version`. Returns False, changing nothing, when the store
+    on disk is for another version; it is then rebuilt on the next open.
+    """
+    meta_path = os.path.join(path, 'meta.json')
+    if not os.path.exists(meta_path):
+        return False
+    with open(meta_path) as f:
+        if json.load(f)['version'] != from_version:
+            return False
+
+    store = TextStore(path)
+    staged = []
+
+    def staged_path(name):
+        staged.append(name)
+        return os.path.join(path, name + '.tmp')
+
+    # The blob only grows: open stores map its old length and never see the new bytes.
+    # If we stop before meta.json is swapped in, the extra bytes are never referenced.
+    offsets = [np.asarray(store.offsets)]
+    present = [np.asarray(store.present)]
+    with open(os.path.join(path, 'blob.bin'), 'ab') as blob:
+        blob.truncate(int(store.offsets[-1]))
+        _write_rows(blob, rows, int(store.offsets[-1]), offsets, present)
+
+    # Merge the new qids into the sorted ones
+    new_qids = np.array(rows['qid'].astype(str).tolist(), dtype=str)
+    qids = np.concatenate([np.asarray(store.qids), new_qids])
+    row_ids = np.concatenate([np.asarray(store.rows), store.n_rows + np.arange(len(new_qids))])
+    order = np.argsort(qids, kind='stable')
+    _write_index(staged_path, np.concatenate(offsets), np.concatenate(present),
+                 qids[order], row_ids[order], version)
+    _swap_in(path, staged)
+    return True
+
+
+def open_text_store(csv_path, path=TEXT_STORE_PATH, version=None):
+    """
+    Opens the store, first rebuilding it from the CSV if it is missing or was
+    built from a different dataset version.
+    """
+    meta_path = os.path.join(path, 'meta.json')
+    stale = True
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            stale = json.load(f)['version'] != version
+    if stale:
+        build_text_store(csv_path, path, version)
+    return TextStore(path)
+
+
+class TextStore:
+    """
+    Read-only, memory-mapped access to the text columns by qid.
+    """
+
+    def __init__(self, path=TEXT_STORE_PATH):
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        self.columns = meta['columns']
+        self.version = meta['version']
+        self.n_rows = meta['rows']
+
+        self.offsets = np.load(os.path.join(path, 'offsets.npy'), mmap_mode='r')
+        self.present = np.load(os.path.join(path, 'present.npy'), mmap_mode='r')
+        self.qids = np.load(os.path.join(path, 'qids.npy'), mmap_mode='r')
+        self.rows = np.load(os.path.join(path, 'rows.npy'), mmap_mode='r')
+        blob_path = os.path.join(path, 'blob.bin')
+        # np.memmap can't map an empty file
+        self.blob = np.memmap(blob_path, dtype=np.uint8, mode='r') if os.path.getsize(blob_path) else b''
+
+    def nbytes(self):
+        """
+        Size of the mapped files. They are paged in on access, so this is an
+        upper bound on what the store keeps resident.
+        """
+        arrays = [self.offsets, self.present, self.qids, self.rows]
+        return sum(a.nbytes for a in arrays) + len(self.blob)
+
+    def _row(self, qid):
+        i = np.searchsorted(self.qids, qid)
+        if i < len(self.qids) and self.qids[i] == qid:
+            return int(self.rows[i])
+        return None
+
+    def _field(self, row, col):
+        c = self.columns.index(col)
+        if not self.present[row, c]:
+            return None
+        k = row * len(self.columns) + c
+        return bytes(self.blob[self.offsets[k]:self.offsets[k + 1]]).decode('utf-8')
+
+    def get(self, qid, column):
+        """
+        One field for one novel, or None if the novel or value is missing.
+        """
+        row = self._row(qid)
+        return None if row is None else self._field(row, column)
+
+    def get_many(self, qids, columns=None):
+        """
+        DataFrame of the requested columns for the given qids, indexed by qid.
+        """
+        columns = columns or self.columns
+        records = []
+        for qid in qids:
+            row = self._row(qid)
+            records.append([None if row is None else self._field(row, col) for col in columns])
+        return pd.DataFrame(records, index=pd.Index(qids, name='qid'), columns=columns)
+
+    def iter_column(self, column):
+        """
+        Yields (qid, value) for every novel in the store, in original row order.
+        """
+        by_row = np.empty(self.n_rows, dtype=self.qids.dtype)
+        by_row[self.rows] = self.qids
+        for row in range(self.n_rows):
+            yield str(by_row[row]), self._field(row, column)
+
+    def count_present(self, column):
+        """
+        Number of novels with a value in `column`.
+        """
+        return int(self.present[:, self.columns.index(column)].sum())
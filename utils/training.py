@@ -0,0 +1,209 @@
+# This was written with the help of Claude AI, but substantial written text is mine.
+
+"""
+Training pipeline for the Text-Only and Text + Period classifiers.
+
+Reproduces the setup described on the Methodology page:
+    - ground-truth Speculative vs. Realistic novels whose cleaned text
+      (text_filtered) is longer than 15 characters: 310 novels in the
+      current CSV, 248 of them in the training split (the count the page
+      gives) and 62 held out
+    - CountVectorizer (1000 features) on the original text, as sparse CSR
+    - one-hot literary period appended for the second model, with the
+      columns in alphabetical order as pd.get_dummies made them
+    - Random Forest (n=200, depth=20), 80/20 stratified split
+With the default seed this gives the published split (248 training and
+62 test novels, 56% speculative) and Text + Period accuracy (75.8%). Text
+Only gets one more test novel right than published (71.0% vs. 69.4%), and
+the Text + Period confusion matrix is off by one novel per row, so the
+retrained results are close to the write-up but not identical.
+
+Tree building and prediction run in a process pool across every core.
+The results, with significance tests on the paired test predictions
+(see utils/significance.py), are written to the metrics artifact that the
+pages read. The Text + Period model and its vectorizer are saved with
+joblib for batch prediction (see utils/inference.py).
+
+Run with:
+    python -m utils.training
+"""
+
+import os
+import argparse
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import parallel_config
+from scipy import sparse
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.metrics import accuracy_score, confusion_matrix, recall_score
+from sklearn.model_selection import train_test_split
+
+from utils.data import CSV_PATH, PERIOD_ORDER, dataset_version
+from utils.metrics import METRICS_PATH, save_metrics
+from utils.normalize import assign_periods
+from utils.significance import compare_models, mcnemar
+
+CLASSES = ['realistic', 'speculative']
+# Cleaned text must be longer than this (novels with exactly 15 characters were left out originally)
+MIN_TEXT_LENGTH = 15
+MAX_FEATURES = 1000
+MODEL_PARAMS = {'n_estimators': 200, 'max_depth': 20}
+MODEL_PATH = 'artifacts/text_period_model.joblib'
+
+# One-hot period columns, alphabetical as in the original analysis. The forest
+# samples features by column position, so the order changes the trees.
+PERIOD_COLUMNS = sorted(PERIOD_ORDER)
+
+
+def has_enough_text(text_filtered):
+    """
+    Whether each cleaned text is long enough to train on or predict from.
+    """
+    return pd.Series(text_filtered, dtype=object).fillna('').str.len().to_numpy() > MIN_TEXT_LENGTH
+
+
+def load_training_frame(csv_path=CSV_PATH):
+    """
+    Ground-truth Speculative/Realistic novels with enough cleaned text.
+    """
+    df = pd.read_csv(csv_path, usecols=['qid', 'publication_year', 'fiction_type', 'is_predicted',
+                                        'text', 'text_filtered'])
+    df['literary_period'] = assign_periods(df['publication_year'])
+    keep = (
+        ~df['is_predicted'].astype(bool) &
+        df['fiction_type'].isin(CLASSES) &
+        has_enough_text(df['text_filtered'])
+    )
+    return df[keep].reset_index(drop=True)
+
+
+def period_features(periods, order=PERIOD_COLUMNS):
+    """
+    One-hot literary period as a sparse CSR matrix (one column per period).
+    """
+    codes = pd.Categorical(periods, categories=order).codes
+    rows = np.flatnonzero(codes >= 0)
+    values = np.ones(len(rows), dtype=np.int64)
+    return sparse.csr_matrix((values, (rows, codes[rows])), shape=(len(codes), len(order)))
+
+
+def text_features(train_text, test_text, max_features=MAX_FEATURES):
+    """
+    Bag-of-words counts fit on the training text only.
+    """
+    vectorizer = CountVectorizer(max_features=max_features)
+    return vectorizer.fit_transform(train_text), vectorizer.transform(test_text), vectorizer
+
+
+def add_period(X, periods, order=PERIOD_COLUMNS):
+    return sparse.hstack([X, period_features(periods, order)], format='csr')
+
+
+def fit_and_predict(X_train, y_train, X_test, seed=42, n_jobs=-1):
+    """
+    Fits a Random Forest with the trees built in a process pool and returns
+    the model and its predictions and speculative-class probabilities.
+    """
+    model = RandomForestClassifier(**MODEL_PARAMS, random_state=seed)
+    # Forests default to threads; loky spreads tree building across processes
+    with parallel_config(backend='loky', n_jobs=n_jobs):
+        model.fit(X_train, y_train)
+        predictions = model.predict(X_test)
+        probabilities = model.predict_proba(X_test)[:, list(model.classes_).index('speculative')]
+    return model, predictions, probabilities
+
+
+def model_metrics(y_true, predictions):
+    return {
+        'accuracy': float(accuracy_score(y_true, predictions)),
+        'recall': dict(zip(CLASSES, recall_score(y_true, predictions, labels=CLASSES, average=None).tolist())),
+        'labels': CLASSES,
+        'confusion': confusion_matrix(y_true, predictions, labels=CLASSES).tolist(),
+    }
+
+
+def save_model(model, vectorizer, version, path=MODEL_PATH):
+    """
+    Saves the Text + Period model with its vectorizer and the period order
+    its one-hot columns follow, for utils/inference.py.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    bundle = {
+        'model': model,
+        'vectorizer': vectorizer,
+        'periods': PERIOD_COLUMNS,
+        'dataset_version': version,
+        'trained_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+    # Swapped in when complete, so a batch run never loads a half-written model
+    joblib.dump(bundle, path + '.tmp')
+    os.replace(path + '.tmp', path)
+
+
+def run_pipeline(csv_path=CSV_PATH, test_size=0.2, seed=42, n_jobs=-1, model_path=MODEL_PATH):
+    """
+    Trains both models on the same split and returns the metrics artifact.
+    The Text + Period model is saved to `model_path` (unless it is None).
+    """
+    version = dataset_version(csv_path)
+    df = load_training_frame(csv_path)
+    train, test = train_test_split(df, test_size=test_size, stratify=df['fiction_type'], random_state=seed)
+
+    X_train, X_test, vectorizer = text_features(train['text'].fillna(''), test['text'].fillna(''))
+    _, pred_text, prob_text = fit_and_predict(X_train, train['fiction_type'], X_test, seed, n_jobs)
+
+    X_train = add_period(X_train, train['literary_period'])
+    X_test = add_period(X_test, test['literary_period'])
+    model, pred_period, prob_period = fit_and_predict(X_train, train['fiction_type'], X_test, seed, n_jobs)
+    if model_path:
+        save_model(model, vectorizer, version, model_path)
+
+    y_test = test['fiction_type'].to_numpy()
+    return {
+        'dataset_version': version,
+        'trained_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'seed': seed,
+        'params': {**MODEL_PARAMS, 'max_features': MAX_FEATURES, 'min_text_length': MIN_TEXT_LENGTH},
+        # Training novels, as the Methodology page counts them
+        'n_novels': len(train),
+        'n_test': len(test),
+        'test_size': test_size,
+        'train_share': train['fiction_type'].value_counts(normalize=True).reindex(CLASSES, fill_value=0).to_dict(),
+        'models': {
+            'text_only': model_metrics(y_test, pred_text),
+            'text_period': model_metrics(y_test, pred_period),
+        },
+        'mcnemar': mcnemar(y_test, pred_text, pred_period),
+        'significance': compare_models(y_test, pred_text, pred_period, seed=seed,
+                                       n_jobs=None if n_jobs == -1 else n_jobs),
+        'alpha': 0.05,
+        # Paired test-set predictions, kept so significance can be recomputed
+        'predictions': {
+            'qid': test['qid'].tolist(),
+            'y_true': y_test.tolist(),
+            'text_only': pred_text.tolist(),
+            'text_period': pred_period.tolist(),
+            'text_only_proba': prob_text.tolist(),
+            'text_period_proba': prob_period.tolist(),
+        },
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Train the Text-Only and Text + Period models.')
+    parser.add_argument('--csv', default=CSV_PATH)
+    parser.add_argument('--out', default=METRICS_PATH)
+    parser.add_argument('--model', default=MODEL_PATH, help='where to save the Text + Period model')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--jobs', type=int, default=-1, help='worker processes (-1 uses every core)')
+    args = parser.parse_args()
+
+    metrics = run_pipeline(args.csv, seed=args.seed, n_jobs=args.jobs, model_path=args.model)
+    save_metrics(metrics, args.out)
+    text_only, text_period = metrics['models']['text_only'], metrics['models']['text_period']
+    print(f"Text-Only: {text_only['accuracy']:.1%}  Text + Period: {text_period['accuracy']:.1%}  "
+          f"McNemar p = {metrics['mcnemar']['p_value']:.4f}  -> {args.out}")
@@ -0,0 +1,401 @@
+# This was written with the help of Claude AI, but substantial written text is mine.
+
+"""
+Rebuilds the novel dataset from a local Wikidata JSON dump.
+
+The dump (`latest-all.json`, optionally .gz or .bz2) has one entity per line,
+so it is streamed line by line and never loaded whole. Lines are handed to a
+process pool in batches (at most a few batches in flight), where a cheap
+substring check skips most entities before any JSON is decoded.
+
+It takes two passes over the dump:
+1. Novels are selected by instance of (P31), and optionally limited to a
+   list of qids (e.g. the WikiProject Novels article list, which is how the
+   original 944 articles were narrowed down to 709). Their claims are
+   written in chunks to a temporary Parquet file, as qids.
+2. The English labels of every entity those claims refer to (authors,
+   genres, countries, ...) are collected.
+The temporary file is then read back in chunks, qids are replaced by
+labels (or left as the qid when an entity has no English label, as in the
+original data) and the derived columns are added:
+- publication_year from the publication date ("+1850-00-00T00:00:00Z" -> 1850)
+- literary_period from the year (utils/normalize.py)
+- genre_from_description: the earliest of DESCRIPTION_GENRES in the
+  description (for every novel; genre_combined only uses it when there is
+  no genre)
+- fiction_type from the genre, using the table in data/genre_map.csv
+- country_grouped: countries with fewer than COUNTRY_MIN_NOVELS novels become 'other'
+- text (title, first line, last line, epigraph, description) and text_filtered (utils/cleaning.py)
+Novels whose genre isn't in the table have no fiction_type. Neither do
+'other'-genre novels with enough cleaned text to classify (more than 15
+characters), as in the original data. Both are left for the model to label
+(python -m utils.inference); 'other' is only kept as a ground-truth label
+for novels with too little text.
+
+Run with:
+    python -m utils.wikidata latest-all.json.gz --qids wikiproject_novels.txt --csv data/final_dataset.csv
+"""
+
+import os
+import re
+import bz2
+import gzip
+import json
+import argparse
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.cleaning import clean_texts
+from utils.normalize import assign_periods
+from utils.training import has_enough_text
+
+OUTPUT_PATH = 'data/wikidata_novels.parquet'
+GENRE_MAP_PATH = 'data/genre_map.csv'
+
+# Column order of final_dataset.csv
+SCHEMA = ['qid', 'label', 'description', 'author', 'genre', 'form_of_creative_work', 'language', 'country',
+          'publication_date', 'publisher', 'instance_of', 'award_received', 'first_line', 'last_line',
+          'epigraph', 'genre_from_description', 'genre_clean', 'genre_combined', 'genre_standardized',
+          'publication_year', 'literary_period', 'country_grouped', 'text', 'text_filtered', 'fiction_type',
+          'is_predicted', 'prediction_confidence']
+
+# Claims whose values are other entities (stored as labels)
+ENTITY_PROPERTIES = {
+    'author': 'P50',
+    'genre': 'P136',
+    'form_of_creative_work': 'P7937',
+    'language': 'P407',
+    'country': 'P495',
+    'publisher': 'P123',
+    'instance_of': 'P31',
+    'award_received': 'P166',
+}
+# Claims whose values are text in some language (the English one is kept)
+TEXT_PROPERTIES = {'first_line': 'P1922', 'last_line': 'P3132', 'epigraph': 'P7150'}
+DATE_PROPERTY = 'P577'
+
+# Instance-of classes that count as novels (literary work, written work, novel,
+# novel series, book series, graphic novel, manga series); see --classes
+NOVEL_CLASSES = ['Q7725634', 'Q47461344', 'Q8261', 'Q1667921', 'Q277759', 'Q725377', 'Q21198342']
+
+# Genre words looked for in descriptions, when a novel has no genre claim
+DESCRIPTION_GENRES = ['fantasy', 'romance', 'historical', 'fairy tale', 'young adult', 'science fiction',
+                      'epistolary', 'horror', 'adventure', 'erotic', 'young-adult', 'satire', 'mystery',
+                      'dystopian']
+
+COUNTRY_MIN_NOVELS = 5
+
+# Columns of the temporary file written by pass 1
+_RAW_COLUMNS = ['qid', 'label', 'description', 'publication_date'] + list(ENTITY_PROPERTIES) + list(TEXT_PROPERTIES)
+
+ID_PATTERN = re.compile(rb'"id":\s*"(Q\d+)"')
+
+# Set in each worker process by _init_worker
+_qids = None
+_class_markers = None
+_classes = None
+_wanted = None
+
+
+def open_dump(path):
+    """
+    Opens a dump for reading bytes, decompressing .gz and .bz2 on the fly.
+    """
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    if path.endswith('.bz2'):
+        return bz2.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def iter_batches(path, batch_lines=2_000):
+    """
+    Lists of raw entity lines (the enclosing [ ] and trailing commas removed).
+    """
+    batch = []
+    with open_dump(path) as f:
+        for line in f:
+            line = line.strip().rstrip(b',')
+            if len(line) < 2:
+                continue
+            batch.append(line)
+            if len(batch) >= batch_lines:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def _init_worker(qids, classes, wanted):
+    global _qids, _class_markers, _classes, _wanted
+    _qids = qids
+    _classes = set(classes)
+    _class_markers = [f'"{c}"'.encode('utf-8') for c in classes]
+    _wanted = wanted
+
+
+def _claim_values(claims, prop):
+    """
+    datavalue values of a property, preferred-rank statements first.
+    """
+    statements = [s for s in claims.get(prop, []) if s.get('rank') != 'deprecated']
+    statements.sort(key=lambda s: s.get('rank') != 'preferred')
+    return [s['mainsnak']['datavalue']['value'] for s in statements
+            if s.get('mainsnak', {}).get('datavalue')]
+
+
+def _english(values):
+    """
+    The English text of monolingual values, else the first one.
+    """
+    for value in values:
+        if value.get('language', '').startswith('en'):
+            return value['text']
+    return values[0]['text'] if values else None
+
+
+def _entity_row(entity):
+    claims = entity.get('claims', {})
+    row = {
+        'qid': entity['id'],
+        'label': entity.get('labels', {}).get('en', {}).get('value'),
+        'description': entity.get('descriptions', {}).get('en', {}).get('value'),
+    }
+    for column, prop in ENTITY_PROPERTIES.items():
+        values = [v['id'] for v in _claim_values(claims, prop) if isinstance(v, dict) and 'id' in v]
+        row[column] = values[0] if values else None
+    for column, prop in TEXT_PROPERTIES.items():
+        row[column] = _english(_claim_values(claims, prop))
+    dates = [v['time'] for v in _claim_values(claims, DATE_PROPERTY) if isinstance(v, dict) and 'time' in v]
+    row['publication_date'] = dates[0] if dates else None
+    return row
+
+
+def _extract_batch(lines):
+    """
+    Rows for the novels in a batch of dump lines (runs in a worker).
+    """
+    rows = []
+    for line in lines:
+        # Cheap checks on the raw bytes first; most entities are skipped here
+        if b'"P31"' not in line or not any(marker in line for marker in _class_markers):
+            continue
+        if _qids is not None:
+            match = ID_PATTERN.search(line, 0, 200)
+            if match is None or match.group(1).decode() not in _qids:
+                continue
+        entity = json.loads(line)
+        if entity.get('type') != 'item' or (_qids is not None and entity['id'] not in _qids):
+            continue
+        classes = {v.get('id') for v in _claim_values(entity.get('claims', {}), 'P31') if isinstance(v, dict)}
+        if classes & _classes:
+            rows.append(_entity_row(entity))
+    return rows
+
+
+def _label_batch(lines):
+    """
+    English labels of the wanted entities in a batch of dump lines (runs in a worker).
+    """
+    labels = {}
+    for line in lines:
+        match = ID_PATTERN.search(line, 0, 200)
+        if match is None or match.group(1).decode() not in _wanted:
+            continue
+        entity = json.loads(line)
+        label = entity.get('labels', {}).get('en', {}).get('value')
+        if label is not None:
+            labels[entity['id']] = label
+    return labels
+
+
+def _bounded_map(pool, fn, batches, window):
+    """
+    pool.map that keeps at most `window` batches in flight, so reading the
+    dump never gets far ahead of the workers. Results come back in order.
+    """
+    if pool is None:
+        yield from map(fn, batches)
+        return
+    pending = deque()
+    for batch in batches:
+        pending.append(pool.submit(fn, batch))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _pool(n_jobs, qids, classes, wanted):
+    if n_jobs == 1:
+        _init_worker(qids, classes, wanted)
+        return None
+    return ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(qids, classes, wanted))
+
+
+def load_genre_map(path=GENRE_MAP_PATH):
+    table = pd.read_csv(path)
+    return dict(zip(table['genre'], table['fiction_type']))
+
+
+def genre_from_description(descriptions, genres=DESCRIPTION_GENRES):
+    """
+    The genre word that appears first in each description, if any.
+    """
+    found = []
+    for text in descriptions:
+        text = text.lower() if isinstance(text, str) else ''
+        hits = [(text.find(g), g) for g in genres if g in text]
+        found.append(min(hits)[1] if hits else None)
+    return found
+
+
+def derive_columns(df, labels, country_counts, genre_map, pool=None, window=4):
+    """
+    Replaces entity qids with labels and adds the derived columns, in place.
+    """
+    for column in ENTITY_PROPERTIES:
+        df[column] = [labels.get(q, q) if isinstance(q, str) else None for q in df[column]]
+
+    df['genre_from_description'] = genre_from_description(df['description'])
+    df['genre_clean'] = df['genre']
+    df['genre_combined'] = df['genre_clean'].fillna(df['genre_from_description'])
+    df['genre_standardized'] = df['genre_combined'].map(genre_map)
+
+    year = df['publication_date'].str.extract(r'^([+-]?\d+)-', expand=False)
+    df['publication_year'] = pd.to_numeric(year, errors='coerce').astype(float)
+    df['literary_period'] = np.asarray(assign_periods(df['publication_year'])).astype(object)
+
+    common = {c for c, n in country_counts.items() if n >= COUNTRY_MIN_NOVELS}
+    df['country_grouped'] = [('unknown' if not isinstance(c, str) else c if c in common else 'other')
+                             for c in df['country']]
+
+    parts = df[['label', 'first_line', 'last_line', 'epigraph', 'description']].to_numpy(dtype=object)
+    df['text'] = [' '.join(p for p in row if isinstance(p, str)) for row in parts]
+    batches = [list(df['text'][i:i + 500]) for i in range(0, len(df), 500)]
+    df['text_filtered'] = [t for batch in _bounded_map(pool, clean_texts, batches, window) for t in batch]
+
+    # 'Other' novels that have enough text go to the model, which labels them speculative or realistic
+    to_predict = (df['genre_standardized'] == 'other').to_numpy() & has_enough_text(df['text_filtered'])
+    df['fiction_type'] = df['genre_standardized'].where(~to_predict)
+    df['is_predicted'] = False
+    df['prediction_confidence'] = np.nan
+    return df[SCHEMA]
+
+
+def ingest(dump_path, out_path=OUTPUT_PATH, csv_path=None, qids=None, classes=NOVEL_CLASSES,
+           genre_map_path=GENRE_MAP_PATH, n_jobs=None, batch_lines=2_000, chunk_rows=50_000):
+    """
+    Streams the dump into `out_path` (Parquet, and `csv_path` if given).
+    Returns the number of novels written.
+    """
+    n_jobs = n_jobs or os.cpu_count() or 1
+    window = 2 * n_jobs
+    os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+    raw_path = out_path + '.raw'
+
+    # Pass 1: novels, with entity claims as qids
+    referenced = set()
+    country_qids = Counter()
+    writer = None
+    buffer = []
+    pool = _pool(n_jobs, qids, classes, None)
+    try:
+        for rows in _bounded_map(pool, _extract_batch, iter_batches(dump_path, batch_lines), window):
+            buffer.extend(rows)
+            for row in rows:
+                referenced.update(row[c] for c in ENTITY_PROPERTIES if row[c])
+                country_qids[row['country']] += 1
+            if len(buffer) >= chunk_rows:
+                writer = _write_raw(buffer, raw_path, writer)
+                buffer = []
+        if buffer or writer is None:
+            writer = _write_raw(buffer, raw_path, writer)
+    finally:
+        if writer is not None:
+            writer.close()
+        if pool is not None:
+            pool.shutdown()
+
+    # Pass 2: English labels of everything the novels refer to
+    labels = {}
+    pool = _pool(n_jobs, None, classes, referenced)
+    try:
+        for found in _bounded_map(pool, _label_batch, iter_batches(dump_path, batch_lines), window):
+            labels.update(found)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    country_counts = Counter()
+    for qid, n in country_qids.items():
+        if qid:
+            country_counts[labels.get(qid, qid)] += n
+
+    # Resolve labels and derive columns, one chunk at a time
+    genre_map = load_genre_map(genre_map_path)
+    n_rows = 0
+    writer = None
+    # The CSV is swapped in when complete, so the app never sees half of it
+    csv_tmp = csv_path + '.tmp' if csv_path else None
+    pool = _pool(n_jobs, None, classes, None)
+    try:
+        for i, batch in enumerate(pq.ParquetFile(raw_path).iter_batches(batch_size=chunk_rows)):
+            df = derive_columns(batch.to_pandas(), labels, country_counts, genre_map, pool, window)
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(out_path, table.schema)
+            writer.write_table(table)
+            if csv_path:
+                df.to_csv(csv_tmp, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+            n_rows += len(df)
+        if writer is None:
+            # No novels found: still write an empty dataset with the right columns
+            empty = derive_columns(pd.DataFrame(columns=_RAW_COLUMNS, dtype=object), labels, country_counts,
+                                   genre_map)
+            pq.write_table(pa.Table.from_pandas(empty, preserve_index=False), out_path)
+            if csv_path:
+                empty.to_csv(csv_tmp, index=False)
+    finally:
+        if writer is not None:
+            writer.close()
+        if pool is not None:
+            pool.shutdown()
+    if csv_path:
+        os.replace(csv_tmp, csv_path)
+    os.remove(raw_path)
+    return n_rows
+
+
+def _write_raw(rows, path, writer):
+    table = pa.table({c: pa.array([row.get(c) for row in rows], type=pa.string()) for c in _RAW_COLUMNS})
+    if writer is None:
+        writer = pq.ParquetWriter(path, table.schema)
+    writer.write_table(table)
+    return writer
+
+
+def read_qids(path):
+    with open(path) as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the novel dataset from a local Wikidata JSON dump.')
+    parser.add_argument('dump', help='path to the dump (.json, .json.gz or .json.bz2)')
+    parser.add_argument('--out', default=OUTPUT_PATH, help='Parquet output')
+    parser.add_argument('--csv', default=None, help='also write the dataset as CSV (e.g. data/final_dataset.csv)')
+    parser.add_argument('--qids', default=None, help='file with one qid per line to limit the dataset to')
+    parser.add_argument('--classes', nargs='+', default=NOVEL_CLASSES, help='instance-of qids that count as novels')
+    parser.add_argument('--genre-map', default=GENRE_MAP_PATH)
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: every core)')
+    args = parser.parse_args()
+
+    n = ingest(args.dump, args.out, args.csv, read_qids(args.qids) if args.qids else None,
+               classes=args.classes, genre_map_path=args.genre_map, n_jobs=args.jobs)
+    print(f"Wrote {n} novels to {args.out}" + (f" and {args.csv}" if args.csv else ''))
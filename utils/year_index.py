@@ -0,0 +1,87 @@
+# This was written with the help of Claude AI, but substantial written text is mine.
+
+"""
+Sorted publication-year index for the Timeline Explorer.
+
+Years are sorted once, and cumulative counts per fiction type are kept for
+each distinct year. A year range is then two binary searches, and every
+count (metrics and histogram bins) is a difference of prefix sums.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class YearIndex:
+    """
+    Prefix sums of novel counts per fiction type, ordered by publication year.
+    """
+
+    def __init__(self, df, types):
+        years = df['publication_year'].to_numpy(dtype=float)
+        valid = np.flatnonzero(~np.isnan(years))
+        order = valid[np.argsort(years[valid], kind='stable')]
+
+        # Row positions sorted by year, for fetching the rows in a range
+        self.rows = order
+        self.sorted_years = years[order]
+        self.years, inverse = np.unique(self.sorted_years, return_inverse=True)
+
+        ftype = df['fiction_type'].to_numpy(dtype=object)[order]
+        self.types = list(types)
+        self.cumulative = {}
+        for t in self.types:
+            per_year = np.bincount(inverse[ftype == t], minlength=len(self.years))
+            self.cumulative[t] = np.concatenate([[0], np.cumsum(per_year)])
+        self.cumulative_total = np.concatenate([[0], np.cumsum(np.bincount(inverse, minlength=len(self.years)))])
+
+    def nbytes(self):
+        """
+        Memory held by the sorted rows, years and prefix sums.
+        """
+        arrays = [self.rows, self.sorted_years, self.years, self.cumulative_total, *self.cumulative.values()]
+        return sum(a.nbytes for a in arrays)
+
+    @property
+    def min_year(self):
+        return self.years[0]
+
+    @property
+    def max_year(self):
+        return self.years[-1]
+
+    def _below(self, year):
+        """
+        Number of distinct years strictly before `year`.
+        """
+        return np.searchsorted(self.years, year, side='left')
+
+    def count(self, start, end, ftype=None):
+        """
+        Novels published in [start, end], optionally of one fiction type.
+        """
+        cumulative = self.cumulative_total if ftype is None else self.cumulative[ftype]
+        return int(cumulative[self._below(end + 1)] - cumulative[self._below(start)])
+
+    def rows_between(self, start, end):
+        """
+        Row positions of novels published in [start, end], in year order.
+        """
+        lo = np.searchsorted(self.sorted_years, start, side='left')
+        hi = np.searchsorted(self.sorted_years, end, side='right')
+        return self.rows[lo:hi]
+
+    def histogram(self, start, end, nbins=50):
+        """
+        Counts per fiction type in whole-year bins covering [start, end].
+        Returns a DataFrame with bin start and width and one column per type.
+        """
+        width = max(1, int(np.ceil((end - start + 1) / nbins)))
+        edges = np.arange(start, end + 1 + width, width)
+        edges[-1] = min(edges[-1], end + 1)
+        positions = self._below(edges)
+
+        bins = pd.DataFrame({'start': edges[:-1], 'width': np.diff(edges)})
+        for t in self.types:
+            bins[t] = np.diff(self.cumulative[t][positions])
+        return bins